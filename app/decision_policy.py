@@ -0,0 +1,140 @@
+"""
+Decision policy for team prediction: answer clear-cut tickets straight from
+the nearest-neighbor vote and escalate only ambiguous ones to the LLM.
+"""
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+def neighbor_votes(neighbors: List[Dict[str, Any]], eps: float = 1e-3) -> List[Dict[str, Any]]:
+    """
+    Distance-weighted team votes from a neighbor list.
+
+    Each neighbor votes for its team with weight 1 / (distance + eps), so a
+    near-duplicate outweighs several loosely related tickets.
+
+    Args:
+        neighbors: Dicts with at least 'team' and 'distance'
+        eps: Keeps exact matches (distance 0) finite
+
+    Returns:
+        Best-first list of {'team', 'weight', 'share', 'count'}; share is the
+        team's fraction of the total weight
+    """
+    weights: Dict[str, float] = {}
+    counts: Counter = Counter()
+    for neighbor in neighbors:
+        team = neighbor.get('team')
+        if not team or team == 'unknown':
+            continue
+        weights[team] = weights.get(team, 0.0) + 1.0 / (max(neighbor['distance'], 0.0) + eps)
+        counts[team] += 1
+
+    total = sum(weights.values())
+    votes = [
+        {"team": team, "weight": weight, "share": weight / total, "count": counts[team]}
+        for team, weight in weights.items()
+    ]
+    return sorted(votes, key=lambda v: v["weight"], reverse=True)
+
+
+class FastPathPolicy:
+    """
+    Gate in front of the LLM call.
+
+    A ticket takes the fast path when the top team's vote share beats the
+    runner-up by at least margin_threshold, enough neighbors were found, the
+    nearest one is close enough and - if team prototypes are available - the
+    prototype ranking agrees on the winner. Everything else is escalated.
+    """
+
+    FAST_PATH = "fast_path"
+    LLM = "llm"
+
+    def __init__(
+        self,
+        enabled: bool = None,
+        margin_threshold: float = None,
+        min_neighbors: int = None,
+        max_distance: float = None,
+        require_prototype_agreement: bool = None
+    ):
+        """
+        Args:
+            enabled: Allow the fast path at all (env FAST_PATH_ENABLED, default true)
+            margin_threshold: Minimum top-vs-runner-up share margin, 0..1 (env FAST_PATH_MARGIN_THRESHOLD, default 0.6)
+            min_neighbors: Neighbors required to trust the vote (env FAST_PATH_MIN_NEIGHBORS, default 5)
+            max_distance: Nearest neighbor must be at most this far (env FAST_PATH_MAX_DISTANCE, default 0.5)
+            require_prototype_agreement: Winner must also top the prototype ranking (env FAST_PATH_REQUIRE_PROTOTYPE_AGREEMENT, default true)
+        """
+        if enabled is None:
+            enabled = os.getenv('FAST_PATH_ENABLED', 'true').lower() == 'true'
+        if require_prototype_agreement is None:
+            require_prototype_agreement = os.getenv('FAST_PATH_REQUIRE_PROTOTYPE_AGREEMENT', 'true').lower() == 'true'
+        self.enabled = enabled
+        self.margin_threshold = margin_threshold if margin_threshold is not None else float(
+            os.getenv('FAST_PATH_MARGIN_THRESHOLD', '0.6'))
+        self.min_neighbors = min_neighbors if min_neighbors is not None else int(
+            os.getenv('FAST_PATH_MIN_NEIGHBORS', '5'))
+        self.max_distance = max_distance if max_distance is not None else float(
+            os.getenv('FAST_PATH_MAX_DISTANCE', '0.5'))
+        self.require_prototype_agreement = require_prototype_agreement
+
+        self.stats: Counter = Counter()
+
+    def decide(
+        self,
+        neighbors: List[Dict[str, Any]],
+        prototype_ranking: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Choose between the fast path and the LLM for one ticket.
+
+        Args:
+            neighbors: Similar tickets with 'team' and 'distance'
+            prototype_ranking: Optional output of TeamPrototypeIndex.rank_teams
+
+        Returns:
+            Dict with 'path' (FAST_PATH or LLM), 'team' (vote winner or None),
+            'confidence' (winner's vote share), 'margin', 'votes' (top 3) and 'reason'
+        """
+        votes = neighbor_votes(neighbors)
+        top = votes[0] if votes else None
+        margin = top["share"] - (votes[1]["share"] if len(votes) > 1 else 0.0) if top else 0.0
+        decision = {
+            "path": self.LLM,
+            "team": top["team"] if top else None,
+            "confidence": top["share"] if top else 0.0,
+            "margin": margin,
+            "votes": votes[:3],
+        }
+
+        if not self.enabled:
+            decision["reason"] = "fast path disabled"
+        elif top is None or len(neighbors) < self.min_neighbors:
+            decision["reason"] = f"only {len(neighbors)} neighbors"
+        elif min(n['distance'] for n in neighbors) > self.max_distance:
+            decision["reason"] = "no close neighbor"
+        elif margin < self.margin_threshold:
+            decision["reason"] = f"vote margin {margin:.2f} < {self.margin_threshold:.2f}"
+        elif self.require_prototype_agreement and prototype_ranking and prototype_ranking[0]["team"] != top["team"]:
+            decision["reason"] = f"prototypes favor {prototype_ranking[0]['team']}"
+        else:
+            decision["path"] = self.FAST_PATH
+            decision["reason"] = (
+                f"{top['count']}/{len(neighbors)} similar tickets belong to {top['team']} "
+                f"({top['share']:.0%} of distance-weighted votes, margin {margin:.2f})"
+            )
+
+        self.stats[decision["path"]] += 1
+        return decision
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return how many tickets took each path."""
+        total = sum(self.stats.values())
+        return {
+            "fast_path": self.stats[self.FAST_PATH],
+            "llm": self.stats[self.LLM],
+            "fast_path_rate": round(self.stats[self.FAST_PATH] / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,258 @@
+"""
+Embedding backends behind EnhancedTicketEmbeddingClient.generate_embedding.
+
+    remote                 - NetApp LLM proxy (OpenAI embeddings API), the default
+    hashing                - hashed TF-IDF projection, pure NumPy, no network
+    sentence-transformers  - local transformer model on CPU (optional dependency)
+
+Each backend embeds into its own Chroma collection (see collection_name) since
+vectors from different backends are not comparable.
+"""
+import os
+import re
+import math
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDF_PATH = Path(__file__).parent.parent / "data" / "hashing_idf.npy"
+
+_TOKEN_RE = re.compile(r"[a-z0-9_][a-z0-9_.\-]*[a-z0-9_]|[a-z0-9]")
+
+
+class EmbeddingBackend:
+    """
+    Interface for embedding providers.
+
+    Subclasses set name/model and implement embed(); embed() raises on
+    failure so callers can split and retry batches.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def cache_model(self) -> str:
+        """Identifier used to key the embedding cache."""
+        return f"{self.name}:{self.model}"
+
+    def collection_name(self, base: str) -> str:
+        """Chroma collection holding this backend's vectors."""
+        return f"{base}_{self.name}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of non-empty texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in input order
+        """
+        raise NotImplementedError
+
+    def reload_if_changed(self) -> bool:
+        """Pick up model state refitted by another process; returns True if reloaded."""
+        return False
+
+    async def close(self):
+        """Release resources held by the backend."""
+
+
+class RemoteEmbeddingBackend(EmbeddingBackend):
+    """Embeddings from the NetApp LLM proxy through an AsyncOpenAI client."""
+
+    name = "remote"
+
+    def __init__(self, llm_client, model: str, semaphore: asyncio.Semaphore, timeout: float):
+        """
+        Args:
+            llm_client: Shared AsyncOpenAI client
+            model: Embedding model name
+            semaphore: Caps concurrent embedding requests
+            timeout: Per-request timeout (seconds)
+        """
+        super().__init__(model)
+        self.llm_client = llm_client
+        self.semaphore = semaphore
+        self.timeout = timeout
+        self.user = os.getenv('JIRA_EMAIL', '').split('@')[0] if os.getenv('JIRA_EMAIL') else 'embedding_client'
+
+    @property
+    def cache_model(self) -> str:
+        # Plain model name keeps entries cached before backends existed valid
+        return self.model
+
+    def collection_name(self, base: str) -> str:
+        # The remote backend owns the original collection
+        return base
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        async with self.semaphore:
+            response = await self.llm_client.embeddings.create(
+                model=self.model,
+                input=texts,
+                user=self.user,
+                timeout=self.timeout
+            )
+        # Results carry their input position; don't rely on response order
+        embeddings = [None] * len(texts)
+        for item in response.data:
+            embeddings[item.index] = item.embedding
+        return embeddings
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Hashed TF-IDF projection (zero extra dependencies).
+
+    Word unigrams and bigrams are hashed into a fixed number of signed
+    buckets, weighted by sublinear term frequency and - once fit() has seen
+    the training corpus - inverse document frequency, then L2-normalized.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int = None, idf_path: str = None):
+        """
+        Args:
+            dimensions: Vector size (env EMBEDDING_HASH_DIM, default 1024)
+            idf_path: Where fit() stores IDF weights (env EMBEDDING_HASH_IDF_PATH)
+        """
+        self.dimensions = dimensions or int(os.getenv('EMBEDDING_HASH_DIM', '1024'))
+        super().__init__(f"tfidf-{self.dimensions}")
+        self.idf_path = Path(idf_path or os.getenv('EMBEDDING_HASH_IDF_PATH', str(DEFAULT_IDF_PATH)))
+        self.idf: Optional[np.ndarray] = None
+        self._idf_digest = ""
+        self._idf_mtime = None
+        self._load_idf()
+
+    def _load_idf(self) -> bool:
+        """Load IDF weights from idf_path; returns True if usable weights were found."""
+        if not self.idf_path.exists():
+            return False
+        mtime = self.idf_path.stat().st_mtime
+        idf = np.load(self.idf_path)
+        self._idf_mtime = mtime
+        if idf.shape != (self.dimensions,):
+            logger.warning(f"Ignoring {self.idf_path}: built for {idf.shape[0]} dimensions")
+            return False
+        self._set_idf(idf)
+        return True
+
+    def _set_idf(self, idf: np.ndarray):
+        # Digest and weights are swapped together so cache keys always match the vectors
+        self._idf_digest = hashlib.sha1(idf.tobytes()).hexdigest()[:12]
+        self.idf = idf
+
+    def reload_if_changed(self) -> bool:
+        """Reload IDF weights when training refitted them in another process."""
+        if self.idf_path.exists() and self.idf_path.stat().st_mtime != self._idf_mtime:
+            if self._load_idf():
+                logger.info(f"Reloaded hashing IDF from {self.idf_path}")
+                return True
+        return False
+
+    @property
+    def cache_model(self) -> str:
+        # IDF weights change the vectors, so a refit must not reuse old cache entries
+        if self.idf is None:
+            return f"{self.name}:{self.model}"
+        return f"{self.name}:{self.model}:{self._idf_digest}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _bucket(self, feature: str):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimensions, (1.0 if value >> 63 else -1.0)
+
+    def _term_vector(self, text: str) -> np.ndarray:
+        counts = {}
+        for feature in self._features(text):
+            bucket, sign = self._bucket(feature)
+            counts[(bucket, sign)] = counts.get((bucket, sign), 0) + 1
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for (bucket, sign), count in counts.items():
+            vector[bucket] += sign * (1.0 + math.log(count))
+        return vector
+
+    def fit(self, texts: List[str]):
+        """
+        Learn IDF weights from a corpus (the training tickets) and persist them.
+
+        Args:
+            texts: Corpus documents
+        """
+        df = np.zeros(self.dimensions, dtype=np.float64)
+        for text in texts:
+            buckets = {self._bucket(feature)[0] for feature in self._features(text or "")}
+            df[list(buckets)] += 1
+        idf = np.log((1 + len(texts)) / (1 + df)).astype(np.float32) + 1.0
+        self.idf_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(self.idf_path, idf)
+        self._set_idf(idf)
+        self._idf_mtime = self.idf_path.stat().st_mtime
+        logger.info(f"Fitted hashing IDF on {len(texts)} documents -> {self.idf_path}")
+
+    def _embed_sync(self, texts: List[str]) -> List[List[float]]:
+        matrix = np.stack([self._term_vector(text) for text in texts])
+        idf = self.idf
+        if idf is not None:
+            matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self._embed_sync, texts)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Local transformer embeddings on CPU via sentence-transformers (optional dependency)."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model: str = None, device: str = None):
+        """
+        Args:
+            model: Model name or path (env LOCAL_EMBEDDING_MODEL, default all-MiniLM-L6-v2)
+            device: Torch device (env LOCAL_EMBEDDING_DEVICE, default cpu)
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=sentence-transformers requires 'pip install sentence-transformers'"
+            ) from e
+
+        super().__init__(model or os.getenv('LOCAL_EMBEDDING_MODEL', 'all-MiniLM-L6-v2'))
+        self._model = SentenceTransformer(self.model, device=device or os.getenv('LOCAL_EMBEDDING_DEVICE', 'cpu'))
+
+    def collection_name(self, base: str) -> str:
+        slug = re.sub(r"[^a-zA-Z0-9]+", "-", self.model.split("/")[-1]).strip("-").lower()
+        return f"{base}_st_{slug}"
+
+    def _embed_sync(self, texts: List[str]) -> List[List[float]]:
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self._embed_sync, texts)
+
+
+BACKENDS = {
+    "remote": RemoteEmbeddingBackend,
+    "hashing": HashingEmbeddingBackend,
+    "sentence-transformers": SentenceTransformerBackend,
+}
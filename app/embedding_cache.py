@@ -0,0 +1,172 @@
+"""
+Persistent content-addressed cache for text embeddings.
+Keyed by (model, hash of normalized text) so identical ticket text is only
+ever embedded once across predictions, retrains and script runs.
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional, Dict, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "data" / "embedding_cache.db"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding store with an LRU size bound.
+
+    Vectors are stored as raw float16 (default) or float32 bytes. Reads
+    refresh an entry's access time; once the cache exceeds max_entries the
+    least recently used entries are evicted. Several processes (training,
+    scheduler) may share the file, so the size is always recounted from the
+    table inside the write transaction rather than tracked per process.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, dtype: str = None):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file (env EMBEDDING_CACHE_PATH, default data/embedding_cache.db)
+            max_entries: LRU bound (env EMBEDDING_CACHE_MAX_ENTRIES, default 50000)
+            dtype: 'float16' or 'float32' storage (env EMBEDDING_CACHE_DTYPE, default float16)
+        """
+        self.path = Path(path or os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_CACHE_PATH)))
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+        self.dtype = np.dtype(dtype or os.getenv("EMBEDDING_CACHE_DTYPE", "float16"))
+        if self.dtype not in (np.float16, np.float32):
+            raise ValueError(f"Unsupported embedding cache dtype: {self.dtype}")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                cache_key   TEXT PRIMARY KEY,
+                model       TEXT NOT NULL,
+                dtype       TEXT NOT NULL,
+                vector      BLOB NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings (last_access);
+        """)
+        self._conn.commit()
+
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Content address for a (model, text) pair."""
+        digest = hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+        return digest
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for text, or None."""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up several texts at once.
+
+        Returns:
+            Embeddings in input order, None where not cached
+        """
+        keys = [self.make_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        unique_keys = list(dict.fromkeys(keys))
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(unique_keys), 500):
+            chunk = unique_keys[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for cache_key, dtype, blob in self._conn.execute(
+                f"SELECT cache_key, dtype, vector FROM embeddings WHERE cache_key IN ({placeholders})",
+                chunk
+            ):
+                found[cache_key] = np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE cache_key = ?",
+                [(now, k) for k in found]
+            )
+            self._conn.commit()
+
+        results = [found.get(k) for k in keys]
+        hits = sum(1 for r in results if r is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        """Store one embedding."""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[Optional[List[float]]]):
+        """Store several embeddings (None entries are skipped) and enforce the size bound."""
+        now = time.time()
+        rows = [
+            (self.make_key(model, text), model, self.dtype.name,
+             np.asarray(embedding, dtype=self.dtype).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+            if embedding is not None
+        ]
+        if not rows:
+            return
+
+        # The INSERT takes the write lock, so the count and eviction below see
+        # every other process's rows and run in the same transaction
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (cache_key, model, dtype, vector, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if self._entries > self.max_entries:
+                self._evict(self._entries - self.max_entries)
+
+    def _evict(self, count: int):
+        """Drop the count least recently used entries (caller commits)."""
+        cursor = self._conn.execute(
+            "DELETE FROM embeddings WHERE cache_key IN "
+            "(SELECT cache_key FROM embeddings ORDER BY last_access LIMIT ?)",
+            (count,)
+        )
+        self._entries -= cursor.rowcount
+        self.evictions += cursor.rowcount
+        logger.info(f"Embedding cache evicted {cursor.rowcount} LRU entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
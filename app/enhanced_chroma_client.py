@@ -5,6 +5,7 @@ Enhanced ChromaDB client with fine-tuning capabilities for better team assignmen
 import os
 import sys
 import json
+import time
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
@@ -17,9 +18,39 @@ load_dotenv()
 
 import chromadb
 import httpx
-from openai import OpenAI
+import numpy as np
+from openai import AsyncOpenAI, APIConnectionError
 
 from app.jira_client import JiraClient
+from app.retry import RetryPolicy
+from app.embedding_cache import EmbeddingCache
+from app.token_budget import count_tokens, truncate_tokens, chunk_tokens
+from app.text_normalizer import TextNormalizer
+from app.embedding_backends import BACKENDS, EmbeddingBackend, RemoteEmbeddingBackend
+from app.vector_index import LocalVectorIndex
+from app.team_prototypes import TeamPrototypeIndex
+from app.decision_policy import FastPathPolicy
+from app.prediction_cache import PredictionCache
+from app.ticket_filters import AZURE_HYPERSCALER_FILTER, field_values
+
+# Bump when the team-prediction prompt changes so cached predictions are not reused
+LLM_PROMPT_VERSION = "1"
+
+# USD per 1K (prompt, completion) tokens for cost estimates; override with LLM_MODEL_COSTS (JSON)
+DEFAULT_LLM_MODEL_COSTS = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+# Neighbor fields passed to the LLM, and defaults for missing metadata
+# Embedding errors caused by the batch contents - splitting the batch isolates the bad text
+EMBEDDING_SPLIT_STATUS_CODES = (400, 413, 422)
+
+SIMILAR_TICKET_FIELDS = ('ticket_id', 'team', 'summary', 'distance')
+SIMILAR_TICKET_DEFAULTS = {'team': 'unknown', 'summary': 'N/A'}
 
 
 class EnhancedTicketEmbeddingClient:
@@ -40,8 +71,15 @@ class EnhancedTicketEmbeddingClient:
         "team-elbrus": "Team Elbrus",
     }
     
-    def __init__(self, host: str = None, port: int = None):
-        """Initialize the enhanced client."""
+    def __init__(self, host: str = None, port: int = None, jira_client: JiraClient = None):
+        """
+        Initialize the enhanced client.
+        
+        Args:
+            host: ChromaDB host (env CHROMA_HOST)
+            port: ChromaDB port (env CHROMA_PORT)
+            jira_client: Shared JiraClient to reuse its connection pool (creates one if omitted)
+        """
         # Read from environment variables if not provided
         self.host = host or os.getenv('CHROMA_HOST', 'localhost')
         self.port = port or int(os.getenv('CHROMA_PORT', '8000'))
@@ -53,35 +91,150 @@ class EnhancedTicketEmbeddingClient:
         )
         
         # Initialize other clients
-        self.jira_client = JiraClient()
+        self.jira_client = jira_client or JiraClient()
         self.llm_client = self._init_llm_client()
         
-        # Collection names
-        self.tickets_collection_name = "jira_tickets"
+        # Per-dependency concurrency caps, shared by all tickets processed in parallel
+        self.embedding_semaphore = asyncio.Semaphore(int(os.getenv('EMBEDDING_MAX_CONCURRENCY', '4')))
+        self.llm_semaphore = asyncio.Semaphore(int(os.getenv('LLM_MAX_CONCURRENCY', '2')))
+        self.chroma_semaphore = asyncio.Semaphore(int(os.getenv('CHROMA_MAX_CONCURRENCY', '4')))
+        
+        # Embedding model and request batching limits
+        self.embedding_model = os.getenv('EMBEDDING_MODEL', 'text-embedding-ada-002')
+        self.embedding_batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '100'))
+        self.embedding_batch_tokens = int(os.getenv('EMBEDDING_BATCH_TOKENS', '50000'))
+        # Transient embedding failures retry the whole batch (EMBEDDING_RETRY_* env overrides)
+        self.embedding_retry_policy = RetryPolicy.from_env("EMBEDDING")
+        
+        # Token budgets (tiktoken) for embedding inputs and the LLM prompt
+        self.embedding_max_tokens = int(os.getenv('EMBEDDING_MAX_TOKENS', '8000'))
+        self.description_max_tokens = int(os.getenv('DESCRIPTION_MAX_TOKENS', '250'))
+        self.llm_description_max_tokens = int(os.getenv('LLM_DESCRIPTION_MAX_TOKENS', '150'))
+        self.embedding_max_chunks = int(os.getenv('EMBEDDING_MAX_CHUNKS', '4'))
+        self.llm_model = os.getenv('LLM_MODEL', 'gpt-4')
+        
+        # Model cascade, cheapest first; the next tier is asked only below the confidence threshold
+        self.llm_cascade = [m.strip() for m in os.getenv('LLM_CASCADE_MODELS', self.llm_model).split(',') if m.strip()]
+        self.llm_cascade_confidence = float(os.getenv('LLM_CASCADE_CONFIDENCE', '0.75'))
+        self.llm_model_costs = {**DEFAULT_LLM_MODEL_COSTS, **json.loads(os.getenv('LLM_MODEL_COSTS', '{}'))}
+        self.llm_tier_stats = {
+            model: {'calls': 0, 'tickets': 0, 'escalations': 0, 'failures': 0, 'latency_seconds': 0.0,
+                    'prompt_tokens': 0, 'completion_tokens': 0, 'cost_usd': 0.0}
+            for model in self.llm_cascade
+        }
+        
+        # Markup / log-noise cleanup before embedding (TEXT_NORMALIZATION=false disables it)
+        if os.getenv('TEXT_NORMALIZATION', 'true').lower() == 'true':
+            self.text_normalizer = TextNormalizer()
+        else:
+            self.text_normalizer = None
+        
+        # Persistent embedding cache (EMBEDDING_CACHE=false disables it)
+        if os.getenv('EMBEDDING_CACHE', 'true').lower() == 'true':
+            self.embedding_cache = EmbeddingCache()
+        else:
+            self.embedding_cache = None
+        
+        # Per-call timeouts (seconds) for the LLM proxy
+        self.embedding_timeout = float(os.getenv('EMBEDDING_TIMEOUT', '30'))
+        self.llm_timeout = float(os.getenv('LLM_TIMEOUT', '60'))
+        
+        # Embedding backend (EMBEDDING_BACKEND=remote|hashing|sentence-transformers)
+        self.embedding_backend = self._init_embedding_backend()
+        
+        # Collection names - each backend keeps its own vectors
+        self.tickets_collection_name = self.embedding_backend.collection_name("jira_tickets")
         
         # Initialize collections
         self._init_collections()
         
+        # In-process kNN mirror of the tickets collection (LOCAL_VECTOR_INDEX=false disables it)
+        self.vector_index_check_seconds = float(os.getenv('LOCAL_VECTOR_INDEX_CHECK_SECONDS', '300'))
+        self._collection_checked_at = time.monotonic()
+        self.vector_index = self._init_vector_index()
+        
+        # Per-team centroid/medoid prototypes for a first-stage team ranking (TEAM_PROTOTYPES=false disables it)
+        self.team_prototypes = self._init_team_prototypes()
+        
+        # Skip the LLM for clear-cut tickets (FAST_PATH_* settings)
+        self.decision_policy = FastPathPolicy()
+        
+        # Labels added to auto-assigned tickets in the same PUT as the Technical Owner (comma-separated, default none)
+        self.auto_assign_labels = [l.strip() for l in os.getenv('AUTO_ASSIGN_LABELS', '').split(',') if l.strip()]
+        
+        # Coalesce concurrent similar-ticket lookups into one batched search (SEARCH_BATCH_SIZE=1 disables it)
+        self.search_batch_size = int(os.getenv('SEARCH_BATCH_SIZE', '32'))
+        self.search_batch_window = float(os.getenv('SEARCH_BATCH_WINDOW_MS', '20')) / 1000
+        self._search_batch_queue = []
+        self._search_batch_timer = None
+        self._search_batch_tasks = set()
+        
+        # Coalesce concurrent LLM predictions into multi-ticket requests (LLM_BATCH_SIZE=1 disables it)
+        self.llm_batch_size = int(os.getenv('LLM_BATCH_SIZE', '1'))
+        self.llm_batch_window = float(os.getenv('LLM_BATCH_WINDOW_MS', '200')) / 1000
+        self._llm_batch_queue = []
+        self._llm_batch_timer = None
+        self._llm_batch_tasks = set()
+        
+        # Persistent LLM prediction cache (PREDICTION_CACHE=false disables it)
+        if os.getenv('PREDICTION_CACHE', 'true').lower() == 'true':
+            self.prediction_cache = PredictionCache()
+        else:
+            self.prediction_cache = None
+        
         # Fine-tuning parameters
         self.team_expertise_weights = self._load_team_expertise_weights()
         self.component_weights = self._load_component_weights()
         self.keyword_team_mapping = self._load_keyword_team_mapping()
     
-    def _init_llm_client(self) -> OpenAI:
-        """Initialize OpenAI client for embeddings."""
+    def _init_llm_client(self) -> AsyncOpenAI:
+        """
+        Initialize the async OpenAI client for embeddings and chat.
+        
+        Both share one pooled httpx.AsyncClient, so concurrent tickets reuse
+        keep-alive connections to the LLM proxy without blocking the event loop.
+        """
         api_key = os.getenv('NETAPP_LLM_API_KEY')
         if not api_key:
             raise ValueError("NETAPP_LLM_API_KEY not set in environment")
         
-        import httpx
-        httpx_client = httpx.Client(verify=False, timeout=60.0)
+        max_connections = int(os.getenv('LLM_MAX_CONNECTIONS', '10'))
+        httpx_client = httpx.AsyncClient(
+            verify=False,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
         
-        return OpenAI(
+        return AsyncOpenAI(
             base_url=os.getenv('NETAPP_LLM_BASE_URL', 'https://llm-proxy-api.ai.openeng.netapp.com'),
             api_key=api_key,
             http_client=httpx_client
         )
     
+    def _init_embedding_backend(self) -> EmbeddingBackend:
+        """Create the embedding backend selected by EMBEDDING_BACKEND (default remote)."""
+        name = os.getenv('EMBEDDING_BACKEND', 'remote').lower()
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND '{name}' (expected one of: {', '.join(BACKENDS)})")
+        
+        if name == RemoteEmbeddingBackend.name:
+            return RemoteEmbeddingBackend(
+                self.llm_client, self.embedding_model, self.embedding_semaphore, self.embedding_timeout
+            )
+        backend = BACKENDS[name]()
+        print(f"🖥️  Using local embedding backend: {backend.name} ({backend.model})")
+        return backend
+    
+    async def close(self):
+        """Release pooled network connections held by this client."""
+        await self.embedding_backend.close()
+        await self.jira_client.close()
+        await self.llm_client.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+        if self.prediction_cache is not None:
+            self.prediction_cache.close()
+    
     def _init_collections(self):
         """Initialize ChromaDB collections."""
         try:
@@ -95,6 +248,113 @@ class EnhancedTicketEmbeddingClient:
                 metadata={"description": "Jira ticket embeddings for team assignment"}
             )
             print(f"✅ Created new tickets collection: {self.tickets_collection_name}")
+        
+        try:
+            self.collection_version = self._collection_version(self.tickets_collection, self.tickets_collection.count())
+        except Exception:
+            self.collection_version = ""
+    
+    @staticmethod
+    def _collection_version(collection, count: int) -> str:
+        """Training stamp plus size of the tickets collection; changes whenever it is retrained."""
+        return f"{(collection.metadata or {}).get('trained_at', '')}:{count}"
+    
+    def _init_vector_index(self) -> Optional[LocalVectorIndex]:
+        """Load the local vector index, syncing it from ChromaDB if missing or out of date."""
+        if os.getenv('LOCAL_VECTOR_INDEX', 'true').lower() != 'true':
+            return None
+        
+        index = LocalVectorIndex(self.tickets_collection_name)
+        index.load()
+        try:
+            if index.needs_sync(self.tickets_collection, self.tickets_collection.count()):
+                count = index.sync_from_collection(self.tickets_collection)
+                print(f"✅ Synced local vector index: {count} tickets")
+        except Exception as e:
+            print(f"⚠️  Could not sync local vector index, using ChromaDB queries: {e}")
+        return index
+    
+    def _init_team_prototypes(self) -> Optional[TeamPrototypeIndex]:
+        """Load team prototypes, building them from the local vector index if missing."""
+        if os.getenv('TEAM_PROTOTYPES', 'true').lower() != 'true':
+            return None
+        
+        self.team_prototypes = TeamPrototypeIndex(self.tickets_collection_name)
+        if not self.team_prototypes.load() and self._use_vector_index():
+            self.rebuild_team_prototypes()
+        return self.team_prototypes
+    
+    def rebuild_team_prototypes(self) -> int:
+        """
+        Rebuild team prototypes from the vectors in the local index.
+        
+        Returns:
+            Number of teams with prototypes (0 if there is nothing to build from)
+        """
+        if getattr(self, 'team_prototypes', None) is None or not self._use_vector_index():
+            return 0
+        snapshot = self.vector_index.snapshot
+        # Unlabeled rows would form a bogus 'unknown' team that can outrank real ones
+        labeled = [i for i, m in enumerate(snapshot.metadatas) if m.get('team') and m['team'] != 'unknown']
+        if not labeled:
+            return 0
+        teams = [snapshot.metadatas[i]['team'] for i in labeled]
+        count = self.team_prototypes.build(snapshot.vectors[labeled], teams)
+        print(f"✅ Built team prototypes for {count} teams")
+        return count
+    
+    def rank_teams(self, embedding: List[float], top_n: int = None) -> List[Dict[str, Any]]:
+        """
+        Score an embedding against every team's prototypes.
+        
+        Args:
+            embedding: Ticket embedding
+            top_n: Keep only the best top_n teams
+            
+        Returns:
+            Best-first list of {'team', 'score', 'margin'} (empty if no prototypes exist)
+        """
+        if self.team_prototypes is None:
+            return []
+        self.team_prototypes.reload_if_changed()
+        return self.team_prototypes.rank_teams(embedding, top_n=top_n)
+    
+    async def refresh_vector_index(self, force: bool = False):
+        """
+        Keep the local index and collection_version in step with ChromaDB.
+        
+        Picks up files rewritten by the training script immediately; at most
+        every LOCAL_VECTOR_INDEX_CHECK_SECONDS re-reads the collection (a
+        retrain on another host recreates it), updates collection_version
+        and re-syncs the index when its count or trained_at stamp no longer
+        matches the collection (or always, with force=True).
+        """
+        if self.vector_index is not None:
+            self.vector_index.reload_if_changed()
+        
+        now = time.monotonic()
+        if not force and now - self._collection_checked_at < self.vector_index_check_seconds:
+            return
+        self._collection_checked_at = now
+        
+        try:
+            async with self.chroma_semaphore:
+                self.tickets_collection = await asyncio.to_thread(
+                    self.chroma_client.get_collection, name=self.tickets_collection_name
+                )
+                count = await asyncio.to_thread(self.tickets_collection.count)
+                self.collection_version = self._collection_version(self.tickets_collection, count)
+                if self.vector_index is None:
+                    return
+                if force or self.vector_index.needs_sync(self.tickets_collection, count):
+                    await asyncio.to_thread(self.vector_index.sync_from_collection, self.tickets_collection)
+                    print(f"🔄 Re-synced local vector index: {len(self.vector_index)} tickets")
+                    await asyncio.to_thread(self.rebuild_team_prototypes)
+        except Exception as e:
+            print(f"⚠️  Vector index refresh failed: {e}")
+    
+    def _use_vector_index(self) -> bool:
+        return self.vector_index is not None and self.vector_index.is_loaded and len(self.vector_index) > 0
     
     def _normalize_team_name(self, team_name: str) -> str:
         """
@@ -197,15 +457,23 @@ class EnhancedTicketEmbeddingClient:
         
         return min(boost, 0.2)  # Cap the boost at 0.2
     
+    def normalize_text(self, text: str) -> str:
+        """Strip Jira markup and log noise from text (no-op if normalization is disabled)."""
+        if self.text_normalizer is None:
+            return text or ""
+        return self.text_normalizer.normalize(text)
+    
     def prepare_ticket_content(self, ticket: Dict[str, Any]) -> str:
         """Prepare ticket content for embedding."""
         content_parts = []
         
         if ticket.get('summary'):
-            content_parts.append(f"Title: {ticket['summary']}")
+            content_parts.append(f"Title: {self.normalize_text(ticket['summary'])}")
         
         if ticket.get('description'):
-            desc = ticket['description'][:1000]
+            desc = truncate_tokens(
+                self.normalize_text(ticket['description']), self.description_max_tokens, self.embedding_model
+            )
             content_parts.append(f"Description: {desc}")
         
         if ticket.get('components'):
@@ -227,42 +495,359 @@ class EnhancedTicketEmbeddingClient:
         return "\n".join(content_parts)
     
     async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for given text using NetApp LLM."""
+        """Generate embedding for given text with the configured backend (cached by content)."""
+        self.embedding_backend.reload_if_changed()
+        cache_model = self.embedding_backend.cache_model
+        text = truncate_tokens(text.strip(), self.embedding_max_tokens, self.embedding_model)
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(cache_model, text)
+            if cached is not None:
+                return cached
+        
         try:
-            user = os.getenv('JIRA_EMAIL', '').split('@')[0] if os.getenv('JIRA_EMAIL') else 'embedding_client'
+            embedding = (await self.embedding_backend.embed([text]))[0]
             
-            response = self.llm_client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text.strip(),
-                user=user
-            )
-            
-            return response.data[0].embedding
+            if self.embedding_cache is not None:
+                self.embedding_cache.put(cache_model, text, embedding)
+            return embedding
             
         except Exception as e:
             print(f"Error generating embedding: {e}")
             raise
     
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with the embedding model's tokenizer (≈4 chars/token if unavailable)."""
+        return count_tokens(text, self.embedding_model)
+    
+    def _pack_embedding_batches(self, items: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Group (index, text) pairs into requests under the item and token limits."""
+        batches = []
+        current, current_tokens = [], 0
+        for index, text in items:
+            tokens = self._count_tokens(text)
+            if current and (len(current) >= self.embedding_batch_size
+                            or current_tokens + tokens > self.embedding_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((index, text))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _embed_batch(self, batch: List[Tuple[int, str]]) -> Dict[int, Optional[List[float]]]:
+        """
+        Embed one packed batch.
+        
+        Transient failures (timeouts, connection errors, 429/5xx) retry the
+        whole batch with backoff. Errors caused by the contents (400/413/422,
+        or a local backend rejecting a text) split the batch in half and
+        retry each half, until the bad text is isolated. Other HTTP errors
+        (e.g. 401) fail the batch as a whole.
+        
+        Returns:
+            Dict of input index -> embedding (None if that text failed)
+        """
+        policy = self.embedding_retry_policy
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                vectors = await self.embedding_backend.embed([text for _, text in batch])
+                return {index: vector for (index, _), vector in zip(batch, vectors)}
+                
+            except Exception as e:
+                status = getattr(e, 'status_code', None)
+                transient = (
+                    (status is not None and policy.should_retry_status(status))
+                    or isinstance(e, (APIConnectionError, httpx.TransportError, asyncio.TimeoutError))
+                )
+                if transient:
+                    attempt += 1
+                    delay = policy.backoff(attempt)
+                    if attempt >= policy.max_attempts or time.monotonic() - started + delay > policy.deadline:
+                        print(f"❌ Embedding batch of {len(batch)} failed after {attempt} attempt(s): {str(e)[:80]}")
+                        return {index: None for index, _ in batch}
+                    print(f"⚠️  Embedding batch of {len(batch)} failed ({str(e)[:80]}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                if len(batch) == 1:
+                    print(f"Error generating embedding for text #{batch[0][0]}: {e}")
+                    return {batch[0][0]: None}
+                if status is not None and status not in EMBEDDING_SPLIT_STATUS_CODES:
+                    print(f"❌ Embedding batch of {len(batch)} failed: {str(e)[:80]}")
+                    return {index: None for index, _ in batch}
+                
+                mid = len(batch) // 2
+                print(f"⚠️  Embedding batch of {len(batch)} rejected ({str(e)[:80]}), splitting into {mid} + {len(batch) - mid}")
+                left, right = await asyncio.gather(
+                    self._embed_batch(batch[:mid]),
+                    self._embed_batch(batch[mid:])
+                )
+                return {**left, **right}
+    
+    async def generate_embeddings(
+        self,
+        texts: List[str],
+        max_tokens: int = None,
+        chunk_long_texts: bool = False
+    ) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for many texts with batched requests.
+        
+        Each text is held to max_tokens tokens: either truncated, or - with
+        chunk_long_texts - split into up to EMBEDDING_MAX_CHUNKS windows whose
+        embeddings are averaged (weighted by token count) and re-normalized.
+        
+        Args:
+            texts: Texts to embed
+            max_tokens: Per-text token budget (default EMBEDDING_MAX_TOKENS)
+            chunk_long_texts: Embed over-budget texts as pooled chunks instead of truncating
+            
+        Returns:
+            Embeddings in the same order as texts; None for empty texts or
+            texts that could not be embedded
+        """
+        max_tokens = min(max_tokens or self.embedding_max_tokens, self.embedding_max_tokens)
+        
+        if not chunk_long_texts:
+            return await self._embed_texts([
+                truncate_tokens(text.strip(), max_tokens, self.embedding_model) if text else text
+                for text in texts
+            ])
+        
+        # Flatten every text into its chunks, embed them together, then pool per text
+        chunks, owners = [], []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            for chunk in chunk_tokens(text.strip(), max_tokens, self.embedding_model,
+                                      max_chunks=self.embedding_max_chunks):
+                chunks.append(chunk)
+                owners.append(i)
+        
+        chunk_embeddings = await self._embed_texts(chunks)
+        
+        grouped: Dict[int, List[Tuple[List[float], int]]] = {}
+        for owner, chunk, embedding in zip(owners, chunks, chunk_embeddings):
+            if embedding is not None:
+                grouped.setdefault(owner, []).append((embedding, self._count_tokens(chunk)))
+        
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for i, parts in grouped.items():
+            if len(parts) == 1:
+                embeddings[i] = parts[0][0]
+                continue
+            vectors = np.array([vector for vector, _ in parts], dtype=np.float32)
+            weights = np.array([tokens for _, tokens in parts], dtype=np.float32)
+            pooled = np.average(vectors, axis=0, weights=weights)
+            norm = np.linalg.norm(pooled)
+            embeddings[i] = (pooled / norm if norm else pooled).tolist()
+        return embeddings
+    
+    async def _embed_texts(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed texts that already fit the token budget.
+        
+        Cached texts are served from the embedding cache; the rest are packed
+        into requests of at most EMBEDDING_BATCH_SIZE items and
+        EMBEDDING_BATCH_TOKENS tokens, which run concurrently (bounded by
+        EMBEDDING_MAX_CONCURRENCY). Transient failures retry a batch with
+        backoff; a batch rejected for its contents is split until the bad
+        text is isolated.
+        """
+        self.embedding_backend.reload_if_changed()
+        cache_model = self.embedding_backend.cache_model
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        items = [(i, text.strip()) for i, text in enumerate(texts) if text and text.strip()]
+        
+        if self.embedding_cache is not None and items:
+            cached = self.embedding_cache.get_many(cache_model, [text for _, text in items])
+            for (index, _), embedding in zip(items, cached):
+                embeddings[index] = embedding
+            items = [(index, text) for index, text in items if embeddings[index] is None]
+        
+        batches = self._pack_embedding_batches(items)
+        results = await asyncio.gather(*[self._embed_batch(batch) for batch in batches])
+        
+        for batch_result in results:
+            for index, embedding in batch_result.items():
+                embeddings[index] = embedding
+        
+        if self.embedding_cache is not None and items:
+            self.embedding_cache.put_many(
+                cache_model,
+                [text for _, text in items],
+                [embeddings[index] for index, _ in items]
+            )
+        return embeddings
+    
+    async def _search_raw(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        where_filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        One neighbor search for many embeddings: a single matrix multiply on
+        the local index, or a single ChromaDB query when the index can't serve it.
+        """
+        await self.refresh_vector_index()
+        if self._use_vector_index():
+            try:
+                return self.vector_index.search_many(query_embeddings, k=n_results, where=where_filter)
+            except ValueError as e:
+                print(f"⚠️  Local index can't evaluate filter ({e}), querying ChromaDB")
+        
+        include = ['distances'] + (['metadatas'] if include_metadata else [])
+        async with self.chroma_semaphore:
+            results = await asyncio.to_thread(
+                self.tickets_collection.query,
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where_filter,
+                include=include
+            )
+        return [
+            {
+                'ids': results['ids'][i],
+                'distances': results['distances'][i],
+                'metadatas': results['metadatas'][i] if include_metadata else [{}] * len(results['ids'][i])
+            }
+            for i in range(len(query_embeddings))
+        ]
+    
+    async def search_similar(self, query_embedding: List[float], n_results: int = 20) -> List[Dict[str, Any]]:
+        """
+        Nearest historical tickets for one embedding, coalesced across callers.
+        
+        With SEARCH_BATCH_SIZE > 1, lookups from concurrently processed
+        tickets are collected for up to SEARCH_BATCH_WINDOW_MS (or until a
+        batch is full) and answered by a single search_similar_batch call.
+        
+        Returns:
+            Neighbor dicts (SIMILAR_TICKET_FIELDS), nearest first
+        """
+        if self.search_batch_size <= 1:
+            return (await self.search_similar_batch([query_embedding], n_results=n_results))[0]
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._search_batch_queue.append((query_embedding, n_results, future))
+        if len(self._search_batch_queue) >= self.search_batch_size:
+            self._flush_search_batch()
+        elif self._search_batch_timer is None:
+            self._search_batch_timer = loop.call_later(self.search_batch_window, self._flush_search_batch)
+        return await future
+    
+    def _flush_search_batch(self):
+        """Run everything queued by search_similar as one batched search."""
+        if self._search_batch_timer is not None:
+            self._search_batch_timer.cancel()
+            self._search_batch_timer = None
+        batch, self._search_batch_queue = self._search_batch_queue, []
+        if batch:
+            task = asyncio.create_task(self._run_search_batch(batch))
+            self._search_batch_tasks.add(task)
+            task.add_done_callback(self._search_batch_tasks.discard)
+    
+    async def _run_search_batch(self, batch: List[Tuple[List[float], int, asyncio.Future]]):
+        """Resolve the callers' futures from one search_similar_batch call."""
+        try:
+            # One search at the largest requested k; each caller keeps its own prefix
+            n_results = max(n for _, n, _ in batch)
+            results = await self.search_similar_batch([embedding for embedding, _, _ in batch], n_results=n_results)
+            for (_, n, future), neighbors in zip(batch, results):
+                if not future.done():
+                    future.set_result(neighbors[:n])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+    
+    async def search_similar_batch(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 20,
+        where_filter: Optional[Dict[str, Any]] = None,
+        fields: Tuple[str, ...] = SIMILAR_TICKET_FIELDS
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Nearest historical tickets for many embeddings at once.
+        
+        All queries share one local matrix multiply (or one ChromaDB request),
+        and each neighbor is projected down to the requested fields.
+        
+        Args:
+            query_embeddings: Query embeddings
+            n_results: Neighbors per query
+            where_filter: Optional metadata filter applied to every query
+            fields: Fields per neighbor - 'ticket_id', 'distance' and/or metadata keys ('team', 'summary', ...)
+            
+        Returns:
+            One list of neighbor dicts per query, nearest first
+        """
+        if not query_embeddings:
+            return []
+        
+        metadata_fields = [f for f in fields if f not in ('ticket_id', 'distance')]
+        raw_results = await self._search_raw(
+            query_embeddings, n_results, where_filter, include_metadata=bool(metadata_fields)
+        )
+        
+        projected = []
+        for result in raw_results:
+            neighbors = []
+            for ticket_id, distance, metadata in zip(result['ids'], result['distances'], result['metadatas']):
+                row = {}
+                for field in fields:
+                    if field == 'ticket_id':
+                        row[field] = ticket_id
+                    elif field == 'distance':
+                        row[field] = distance
+                    else:
+                        row[field] = metadata.get(field, SIMILAR_TICKET_DEFAULTS.get(field))
+                neighbors.append(row)
+            projected.append(neighbors)
+        return projected
+    
     def find_similar_tickets(
         self, 
         query_embedding: List[float], 
         n_results: int = 20,
-        where_filter: Optional[Dict[str, Any]] = None
+        where_filter: Optional[Dict[str, Any]] = None,
+        include_documents: bool = False
     ) -> Dict[str, Any]:
-        """Find similar tickets using vector similarity search."""
+        """
+        Find similar tickets using vector similarity search.
+        
+        Uses the local vector index unless documents are requested (only
+        ChromaDB stores them) or the filter is not supported locally.
+        """
         try:
+            if not include_documents and self._use_vector_index():
+                self.vector_index.reload_if_changed()
+                try:
+                    results = self.vector_index.search(query_embedding, k=n_results, where=where_filter)
+                    return {**results, 'documents': []}
+                except ValueError:
+                    pass
+            
+            include = ['metadatas', 'distances'] + (['documents'] if include_documents else [])
             results = self.tickets_collection.query(
                 query_embeddings=[query_embedding],
                 n_results=n_results,
                 where=where_filter,
-                include=['metadatas', 'documents', 'distances']
+                include=include
             )
             
             return {
                 'ids': results['ids'][0],
                 'distances': results['distances'][0],
                 'metadatas': results['metadatas'][0],
-                'documents': results['documents'][0]
+                'documents': results['documents'][0] if include_documents else []
             }
             
         except Exception as e:
@@ -424,6 +1009,9 @@ class EnhancedTicketEmbeddingClient:
         """
         Send email notification with prediction results.
         
+        Blocks on SMTP; async callers run it with asyncio.to_thread so other
+        in-flight tickets keep moving.
+        
         Args:
             ticket_key: JIRA ticket key
             result: Prediction result dictionary
@@ -522,6 +1110,37 @@ class EnhancedTicketEmbeddingClient:
         except Exception as e:
             print(f"⚠️  Failed to send email notification: {e}")
     
+    def _prediction_cache_key(
+        self,
+        new_ticket: Dict[str, str],
+        similar_tickets: List[Dict[str, Any]],
+        model: str
+    ) -> Optional[str]:
+        """Prediction-cache key for a ticket, the neighbors shown to the LLM and the model (None if caching is off)."""
+        if self.prediction_cache is None:
+            return None
+        return PredictionCache.make_key(
+            f"{new_ticket['summary']}\n{new_ticket['description'] or ''}",
+            [ticket['ticket_id'] for ticket in similar_tickets[:10]],
+            model,
+            LLM_PROMPT_VERSION,
+            self.collection_version
+        )
+    
+    def _format_ticket_context(self, new_ticket: Dict[str, str], similar_tickets: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Render a ticket and its top 10 similar tickets for an LLM prompt: (ticket_text, similar_tickets_text)."""
+        ticket_text = (
+            f"Ticket: {new_ticket['key']}\n"
+            f"Summary: {new_ticket['summary']}\n"
+            f"Description: {truncate_tokens(new_ticket['description'] or '', self.llm_description_max_tokens, self.llm_model, suffix='...')}"
+        )
+        similar_tickets_text = "\n".join([
+            f"{i+1}. [{ticket['ticket_id']}] Team: {ticket['team']} | Distance: {ticket['distance']:.4f}\n"
+            f"   Summary: {ticket['summary']}"
+            for i, ticket in enumerate(similar_tickets[:10])
+        ])
+        return ticket_text, similar_tickets_text
+    
     async def _predict_team_with_llm(
         self,
         new_ticket: Dict[str, str],
@@ -530,6 +1149,9 @@ class EnhancedTicketEmbeddingClient:
         """
         Use LLM to predict the best team based on new ticket and similar historical tickets.
         
+        Runs the model cascade (LLM_CASCADE_MODELS, cheapest first); if no
+        tier answers, the neighbors' majority vote is used.
+        
         Args:
             new_ticket: Dict with 'key', 'summary', 'description' of new ticket
             similar_tickets: List of similar tickets from ChromaDB with team assignments
@@ -537,19 +1159,87 @@ class EnhancedTicketEmbeddingClient:
         Returns:
             Tuple of (predicted_team, confidence, reasoning)
         """
+        prediction = await self._run_cascade(new_ticket, similar_tickets)
+        if prediction is not None:
+            return prediction
+        
+        # Fallback to simple vote counting
+        print("⚠️  No LLM tier produced a prediction, falling back to vote counting")
+        team_votes = {}
+        for ticket in similar_tickets:
+            team = ticket['team']
+            team_votes[team] = team_votes.get(team, 0) + 1
+        team = max(team_votes.items(), key=lambda x: x[1])[0]
+        confidence = team_votes[team] / len(similar_tickets)
+        reasoning = f"LLM failed, used vote counting: {team_votes[team]}/{len(similar_tickets)} votes"
+        return team, confidence, reasoning
+    
+    async def _run_cascade(
+        self,
+        new_ticket: Dict[str, str],
+        similar_tickets: List[Dict[str, Any]],
+        start_tier: int = 0,
+        best: Optional[Tuple[str, float, str]] = None
+    ) -> Optional[Tuple[str, float, str]]:
+        """
+        Ask cascade tiers in order until one is confident enough.
+        
+        The next, more expensive tier is only asked while confidence is below
+        LLM_CASCADE_CONFIDENCE. If the last tier to answer is still unsure,
+        the most confident answer seen is returned.
+        
+        Args:
+            new_ticket: Ticket to predict
+            similar_tickets: Its neighbor context
+            start_tier: First tier to ask (batch escalations skip tier 0)
+            best: Answer already obtained from an earlier tier
+            
+        Returns:
+            (team, confidence, reasoning), or None if no tier answered
+        """
+        for tier in range(start_tier, len(self.llm_cascade)):
+            model = self.llm_cascade[tier]
+            prediction = await self._query_llm_for_team(new_ticket, similar_tickets, model)
+            if prediction is None:
+                continue
+            if best is None or prediction[1] > best[1]:
+                best = prediction
+            if prediction[1] >= self.llm_cascade_confidence:
+                return prediction
+            if tier < len(self.llm_cascade) - 1:
+                self.llm_tier_stats[model]['escalations'] += 1
+                print(f"⤴️  {model} confidence {prediction[1]:.1%} < {self.llm_cascade_confidence:.0%}, "
+                      f"escalating to {self.llm_cascade[tier + 1]}")
+        return best
+    
+    async def _query_llm_for_team(
+        self,
+        new_ticket: Dict[str, str],
+        similar_tickets: List[Dict[str, Any]],
+        model: str
+    ) -> Optional[Tuple[str, float, str]]:
+        """
+        Ask one model for a team prediction (served from the prediction cache when possible).
+        
+        Returns:
+            (team, confidence, reasoning), or None if the call failed or the
+            answer didn't follow the format
+        """
+        # Identical ticket text + neighbors + model/prompt/index version -> reuse the answer
+        cache_key = self._prediction_cache_key(new_ticket, similar_tickets, model)
+        if cache_key is not None:
+            cached = self.prediction_cache.get(cache_key)
+            if cached is not None:
+                print(f"♻️  Using cached {model} prediction for {new_ticket['key']}")
+                return cached['team'], cached['confidence'], cached['reasoning']
+        
         # Build prompt for LLM
-        similar_tickets_text = "\n".join([
-            f"{i+1}. [{ticket['ticket_id']}] Team: {ticket['team']} | Distance: {ticket['distance']:.4f}\n"
-            f"   Summary: {ticket['summary']}"
-            for i, ticket in enumerate(similar_tickets[:10])
-        ])
+        ticket_text, similar_tickets_text = self._format_ticket_context(new_ticket, similar_tickets)
         
         prompt = f"""You are an expert JIRA ticket triaging system for NetApp. Your task is to assign a new JIRA ticket to the most appropriate team based on similar historical tickets.
 
 NEW TICKET TO ASSIGN:
-Ticket: {new_ticket['key']}
-Summary: {new_ticket['summary']}
-Description: {new_ticket['description'][:500]}...
+{ticket_text}
 
 TOP 10 MOST SIMILAR HISTORICAL TICKETS (from ChromaDB vector search):
 {similar_tickets_text}
@@ -575,16 +1265,20 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
             # Call LLM (NetApp proxy requires 'user' field with email format)
             user = os.getenv('JIRA_EMAIL', '').split('@')[0] if os.getenv('JIRA_EMAIL') else 'webhook_client'
             
-            response = self.llm_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert JIRA ticket assignment system."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=300,
-                user=user  # Required by NetApp LLM proxy
-            )
+            started = time.monotonic()
+            async with self.llm_semaphore:
+                response = await self.llm_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert JIRA ticket assignment system."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=300,
+                    user=user,  # Required by NetApp LLM proxy
+                    timeout=self.llm_timeout
+                )
+            self._record_llm_call(model, started, response, tickets=1)
             
             llm_response = response.choices[0].message.content.strip()
             
@@ -602,30 +1296,264 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
                 elif line.startswith('REASONING:'):
                     reasoning = line.replace('REASONING:', '').strip()
             
-            # Fallback: if LLM didn't follow format, use vote counting
             if not team:
-                print("⚠️  LLM response didn't follow format, falling back to vote counting")
-                team_votes = {}
-                for ticket in similar_tickets:
-                    team = ticket['team']
-                    team_votes[team] = team_votes.get(team, 0) + 1
-                team = max(team_votes.items(), key=lambda x: x[1])[0]
-                confidence = team_votes[team] / len(similar_tickets)
-                reasoning = f"Vote counting fallback: {team_votes[team]}/{len(similar_tickets)} similar tickets assigned to {team}"
+                print(f"⚠️  {model} response didn't follow format")
+                return None
             
+            if cache_key is not None:
+                self.prediction_cache.put(cache_key, {"team": team, "confidence": confidence, "reasoning": reasoning})
             return team, confidence, reasoning
             
         except Exception as e:
-            print(f"⚠️  LLM prediction failed: {e}, falling back to vote counting")
-            # Fallback to simple vote counting
-            team_votes = {}
-            for ticket in similar_tickets:
-                team = ticket['team']
-                team_votes[team] = team_votes.get(team, 0) + 1
-            team = max(team_votes.items(), key=lambda x: x[1])[0]
-            confidence = team_votes[team] / len(similar_tickets)
-            reasoning = f"LLM failed, used vote counting: {team_votes[team]}/{len(similar_tickets)} votes"
-            return team, confidence, reasoning
+            self.llm_tier_stats[model]['failures'] += 1
+            print(f"⚠️  LLM prediction with {model} failed: {e}")
+            return None
+    
+    def _record_llm_call(self, model: str, started: float, response, tickets: int):
+        """Add one completed LLM request to the per-tier latency/token/cost counters."""
+        stats = self.llm_tier_stats[model]
+        stats['calls'] += 1
+        stats['tickets'] += tickets
+        stats['latency_seconds'] += time.monotonic() - started
+        
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        stats['prompt_tokens'] += prompt_tokens
+        stats['completion_tokens'] += completion_tokens
+        
+        input_cost, output_cost = self.llm_model_costs.get(model, (0.0, 0.0))
+        stats['cost_usd'] += prompt_tokens / 1000 * input_cost + completion_tokens / 1000 * output_cost
+    
+    def get_llm_metrics(self) -> Dict[str, Any]:
+        """
+        Per-tier prediction counters.
+        
+        Returns:
+            Dict with 'knn' (fast-path decisions) and 'tiers': per model the
+            calls, tickets answered, escalations, failures, average latency,
+            token usage and estimated cost (from LLM_MODEL_COSTS)
+        """
+        tiers = {}
+        for model in self.llm_cascade:
+            stats = dict(self.llm_tier_stats[model])
+            stats['avg_latency_seconds'] = round(stats['latency_seconds'] / stats['calls'], 3) if stats['calls'] else 0.0
+            stats['latency_seconds'] = round(stats['latency_seconds'], 3)
+            stats['cost_usd'] = round(stats['cost_usd'], 4)
+            tiers[model] = stats
+        return {"knn": self.decision_policy.get_stats(), "tiers": tiers}
+    
+    async def predict_teams_batch(
+        self,
+        requests: List[Tuple[Dict[str, str], List[Dict[str, Any]]]]
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Predict teams for several tickets with one LLM request per LLM_BATCH_SIZE tickets.
+        
+        Each ticket keeps its own neighbor context; the first cascade tier
+        answers with a JSON list of per-ticket predictions. Cached tickets are
+        answered from the prediction cache, any ticket missing from (or
+        malformed in) the JSON answer falls back to an individual
+        _predict_team_with_llm call, and low-confidence answers escalate to
+        the next cascade tiers individually.
+        
+        Args:
+            requests: (new_ticket, similar_tickets) pairs, as for _predict_team_with_llm
+            
+        Returns:
+            (predicted_team, confidence, reasoning) per request, in input order
+        """
+        model = self.llm_cascade[0]
+        results: List[Optional[Tuple[str, float, str]]] = [None] * len(requests)
+        pending = []
+        for i, (new_ticket, similar_tickets) in enumerate(requests):
+            cache_key = self._prediction_cache_key(new_ticket, similar_tickets, model)
+            cached = self.prediction_cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[i] = (cached['team'], cached['confidence'], cached['reasoning'])
+            else:
+                pending.append(i)
+        
+        batch_size = max(1, self.llm_batch_size)
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        answers = await asyncio.gather(*[
+            self._request_batch_prediction([requests[i] for i in chunk], model) for chunk in chunks
+        ])
+        
+        fallback = []
+        for chunk, parsed in zip(chunks, answers):
+            for i in chunk:
+                new_ticket, similar_tickets = requests[i]
+                prediction = parsed.get(new_ticket['key'])
+                if prediction is None:
+                    fallback.append(i)
+                    continue
+                results[i] = prediction
+                cache_key = self._prediction_cache_key(new_ticket, similar_tickets, model)
+                if cache_key is not None:
+                    team, confidence, reasoning = prediction
+                    self.prediction_cache.put(cache_key, {"team": team, "confidence": confidence, "reasoning": reasoning})
+        
+        if fallback:
+            print(f"⚠️  {len(fallback)} ticket(s) missing from batched LLM answer, predicting individually")
+            singles = await asyncio.gather(*[self._predict_team_with_llm(*requests[i]) for i in fallback])
+            for i, prediction in zip(fallback, singles):
+                results[i] = prediction
+        
+        # Unsure first-tier answers go up the cascade one ticket at a time
+        escalate = [
+            i for i in range(len(requests))
+            if i not in fallback and results[i][1] < self.llm_cascade_confidence
+        ] if len(self.llm_cascade) > 1 else []
+        if escalate:
+            self.llm_tier_stats[model]['escalations'] += len(escalate)
+            print(f"⤴️  Escalating {len(escalate)} low-confidence ticket(s) beyond {model}")
+            upgraded = await asyncio.gather(*[
+                self._run_cascade(*requests[i], start_tier=1, best=results[i]) for i in escalate
+            ])
+            for i, prediction in zip(escalate, upgraded):
+                results[i] = prediction
+        
+        return results
+    
+    async def _request_batch_prediction(
+        self,
+        requests: List[Tuple[Dict[str, str], List[Dict[str, Any]]]],
+        model: str
+    ) -> Dict[str, Tuple[str, float, str]]:
+        """
+        Send one multi-ticket prompt and parse its JSON answer.
+        
+        Returns:
+            Dict of ticket key -> (team, confidence, reasoning) for every ticket
+            the model answered validly (empty if the call or parsing failed)
+        """
+        sections = []
+        for n, (new_ticket, similar_tickets) in enumerate(requests, 1):
+            ticket_text, similar_tickets_text = self._format_ticket_context(new_ticket, similar_tickets)
+            sections.append(
+                f"=== TICKET {n} OF {len(requests)} ===\n{ticket_text}\n\n"
+                f"TOP 10 MOST SIMILAR HISTORICAL TICKETS (from ChromaDB vector search):\n{similar_tickets_text}"
+            )
+        keys = [new_ticket['key'] for new_ticket, _ in requests]
+        
+        prompt = f"""You are an expert JIRA ticket triaging system for NetApp. Assign each of the {len(requests)} new JIRA tickets below to the most appropriate team, using that ticket's own similar historical tickets.
+
+{chr(10).join(sections)}
+
+INSTRUCTIONS:
+1. Treat every ticket independently - only use the similar tickets listed under it
+2. Analyze its technical content (protocols, components, error messages, keywords)
+3. Consider the team assignments of its most similar tickets (lower distance = more similar)
+4. Determine which team is the best match
+
+RESPOND WITH ONLY A JSON OBJECT, NO OTHER TEXT, IN THIS SCHEMA:
+{{"predictions": [{{"ticket": "<ticket key>", "team": "<team-name>", "confidence": <0.0-1.0>, "reasoning": "<brief explanation>"}}]}}
+
+Include exactly one prediction for each of these tickets: {", ".join(keys)}
+"""
+        
+        try:
+            user = os.getenv('JIRA_EMAIL', '').split('@')[0] if os.getenv('JIRA_EMAIL') else 'webhook_client'
+            
+            started = time.monotonic()
+            async with self.llm_semaphore:
+                response = await self.llm_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert JIRA ticket assignment system. You answer in JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=150 * len(requests) + 100,
+                    user=user,  # Required by NetApp LLM proxy
+                    timeout=self.llm_timeout
+                )
+            
+            self._record_llm_call(model, started, response, tickets=len(requests))
+            
+            return self._parse_batch_predictions(response.choices[0].message.content, keys)
+            
+        except Exception as e:
+            self.llm_tier_stats[model]['failures'] += 1
+            print(f"⚠️  Batched LLM prediction with {model} failed for {len(requests)} ticket(s): {e}")
+            return {}
+    
+    @staticmethod
+    def _parse_batch_predictions(content: str, keys: List[str]) -> Dict[str, Tuple[str, float, str]]:
+        """Extract valid per-ticket predictions from a JSON answer (tolerates code fences and surrounding text)."""
+        content = (content or "").strip()
+        start, end = content.find('{'), content.rfind('}')
+        if start == -1 or end <= start:
+            print("⚠️  Batched LLM answer contained no JSON object")
+            return {}
+        try:
+            payload = json.loads(content[start:end + 1])
+        except json.JSONDecodeError as e:
+            print(f"⚠️  Could not parse batched LLM answer as JSON: {e}")
+            return {}
+        
+        parsed = {}
+        wanted = set(keys)
+        for item in payload.get('predictions', []) if isinstance(payload, dict) else []:
+            if not isinstance(item, dict):
+                continue
+            key, team = item.get('ticket'), item.get('team')
+            if key not in wanted or not isinstance(team, str) or not team.strip():
+                continue
+            try:
+                confidence = min(1.0, max(0.0, float(item.get('confidence', 0.5))))
+            except (TypeError, ValueError):
+                confidence = 0.5
+            parsed[key] = (team.strip(), confidence, str(item.get('reasoning', '')).strip())
+        return parsed
+    
+    async def _predict_team(
+        self,
+        new_ticket: Dict[str, str],
+        similar_tickets: List[Dict[str, Any]]
+    ) -> Tuple[str, float, str]:
+        """
+        LLM team prediction for one ticket, coalesced into batches when enabled.
+        
+        With LLM_BATCH_SIZE > 1, concurrent callers are collected for up to
+        LLM_BATCH_WINDOW_MS (or until a batch is full) and answered by a
+        single predict_teams_batch request.
+        """
+        if self.llm_batch_size <= 1:
+            return await self._predict_team_with_llm(new_ticket, similar_tickets)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._llm_batch_queue.append((new_ticket, similar_tickets, future))
+        if len(self._llm_batch_queue) >= self.llm_batch_size:
+            self._flush_llm_batch()
+        elif self._llm_batch_timer is None:
+            self._llm_batch_timer = loop.call_later(self.llm_batch_window, self._flush_llm_batch)
+        return await future
+    
+    def _flush_llm_batch(self):
+        """Send everything queued by _predict_team as one batch."""
+        if self._llm_batch_timer is not None:
+            self._llm_batch_timer.cancel()
+            self._llm_batch_timer = None
+        batch, self._llm_batch_queue = self._llm_batch_queue, []
+        if batch:
+            task = asyncio.create_task(self._run_llm_batch(batch))
+            self._llm_batch_tasks.add(task)
+            task.add_done_callback(self._llm_batch_tasks.discard)
+    
+    async def _run_llm_batch(self, batch: List[Tuple[Dict[str, str], List[Dict[str, Any]], asyncio.Future]]):
+        """Resolve the callers' futures from one predict_teams_batch call."""
+        try:
+            predictions = await self.predict_teams_batch([(ticket, similar) for ticket, similar, _ in batch])
+            for (_, _, future), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(prediction)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
     
     async def process_webhook_ticket(self, ticket_key: str, assign_in_jira: bool = True) -> Dict[str, Any]:
         """
@@ -641,29 +1569,45 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
         try:
             # Fetch ticket from JIRA
             print(f"🎫 Processing webhook for {ticket_key}")
-            ticket = self.jira_client.fetch_ticket(ticket_key)
+            ticket = await self.jira_client.fetch_ticket_async(ticket_key)
             
             if not ticket:
                 return {"status": "error", "message": "Failed to fetch ticket from JIRA"}
             
+        except Exception as e:
+            error_msg = f"Webhook processing failed: {str(e)}"
+            print(f"❌ {error_msg}")
+            await asyncio.to_thread(self.send_email_notification, ticket_key, None, error=error_msg)
+            return {"status": "error", "message": error_msg}
+        
+        return await self.process_ticket_data(ticket, assign_in_jira=assign_in_jira)
+    
+    async def process_ticket_data(self, ticket: Dict[str, Any], assign_in_jira: bool = True) -> Dict[str, Any]:
+        """
+        Filter, predict, assign and notify for an already-fetched ticket.
+        
+        Lets callers that already hold the issue (e.g. from a search) skip the
+        per-ticket Jira GET done by process_webhook_ticket.
+        
+        Args:
+            ticket: Ticket dict as returned by JiraClient.fetch_ticket / parse_ticket
+                    (key, summary, description, project, issuetype, custom fields).
+                    A raw search result ({'key': ..., 'fields': {...}}) is also accepted.
+            assign_in_jira: Whether to update JIRA Technical Owner field
+            
+        Returns:
+            Dictionary with processing results
+        """
+        if 'fields' in ticket:
+            ticket = self.jira_client.parse_ticket(ticket['key'], ticket, debug_dump=False)
+        ticket_key = ticket['key']
+        
+        try:
             # Check filters: NFSAAS project + Bug type + Azure + No Technical Owner
             project_key = ticket.get('project', {}).get('key', '')
             issue_type = ticket.get('issuetype', {}).get('name', '')
             technical_owner = ticket.get('customfield_10050')  # Technical Owner field
             
-            # Get Hyperscaler field (customfield_16202) - Azure (array format)
-            hyperscaler_field = ticket.get('customfield_16202')
-            if hyperscaler_field:
-                # Field is an array: [{"value": "Azure", "id": "16809"}]
-                if isinstance(hyperscaler_field, list) and len(hyperscaler_field) > 0:
-                    hyperscaler_value = hyperscaler_field[0].get('value', '')
-                elif isinstance(hyperscaler_field, dict):
-                    hyperscaler_value = hyperscaler_field.get('value', '')
-                else:
-                    hyperscaler_value = str(hyperscaler_field)
-            else:
-                hyperscaler_value = ''
-            
             # Filter 1: NFSAAS project
             if project_key != 'NFSAAS':
                 print(f"⏭️  Skipping: Not NFSAAS project (found: {project_key})")
@@ -674,8 +1618,10 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
                 print(f"⏭️  Skipping: Not Bug type (found: {issue_type})")
                 return {"status": "skipped", "reason": "Not Bug type"}
             
-            # Filter 3: Hyperscaler must be Azure
-            if hyperscaler_value.upper() != 'AZURE':
+            # Filter 3: Hyperscaler (multi-select, e.g. [{"value": "Azure"}]) must include Azure -
+            # same any-value match as the scheduler's pushed-down filter
+            if not AZURE_HYPERSCALER_FILTER.matches(ticket):
+                hyperscaler_value = ', '.join(field_values(ticket.get(AZURE_HYPERSCALER_FILTER.field)))
                 print(f"⏭️  Skipping: Not Azure hyperscaler (found: {hyperscaler_value})")
                 return {"status": "skipped", "reason": f"Not Azure (found: {hyperscaler_value})"}
             
@@ -687,38 +1633,41 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
             print(f"✅ Ticket passes filters: NFSAAS + Bug + Azure + No owner")
             
             # Generate embedding and query ChromaDB for similar tickets
-            full_content = f"{ticket.get('summary', '')} {ticket.get('description', '')}"
+            # Same normalized "summary description" form the training script embeds
+            summary = self.normalize_text(ticket.get('summary', ''))
+            description = self.normalize_text(ticket.get('description', ''))
+            full_content = f"{summary} {description}"
             embedding = await self.generate_embedding(full_content)
             
-            results = self.tickets_collection.query(
-                query_embeddings=[embedding],
-                n_results=20
-            )
+            # Near-free baseline: best-matching team prototypes
+            team_ranking = self.rank_teams(embedding, top_n=3)
+            if team_ranking:
+                top = team_ranking[0]
+                print(f"📐 Prototype baseline: {top['team']} (score {top['score']:.3f}, margin {top['margin']:.3f})")
             
-            # Prepare context for LLM with top similar tickets
-            print(f"🔍 Found {len(results['ids'][0])} similar tickets, sending to LLM for analysis...")
-            
-            similar_tickets_context = []
-            for i in range(len(results['ids'][0])):
-                similar_tickets_context.append({
-                    "ticket_id": results['ids'][0][i],
-                    "team": results['metadatas'][0][i].get('team', 'unknown'),
-                    "summary": results['metadatas'][0][i].get('summary', 'N/A'),
-                    "distance": results['distances'][0][i]
-                })
-            
-            # Send to LLM for team prediction
-            predicted_team, confidence, llm_reasoning = await self._predict_team_with_llm(
-                new_ticket={
-                    "key": ticket_key,
-                    "summary": ticket.get('summary', ''),
-                    "description": ticket.get('description', '')
-                },
-                similar_tickets=similar_tickets_context
-            )
+            # Context for LLM: top similar tickets projected to id/team/summary/distance
+            similar_tickets_context = await self.search_similar(embedding, n_results=20)
+            print(f"🔍 Found {len(similar_tickets_context)} similar tickets")
             
-            print(f"🎯 LLM Predicted: {predicted_team} ({confidence:.1%} confidence)")
-            print(f"💭 LLM Reasoning: {llm_reasoning}")
+            # Decide from the distance-weighted neighbor vote, or escalate to the LLM
+            decision = self.decision_policy.decide(similar_tickets_context, team_ranking)
+            if decision['path'] == FastPathPolicy.FAST_PATH:
+                predicted_team = decision['team']
+                confidence = decision['confidence']
+                llm_reasoning = f"Fast path (LLM skipped): {decision['reason']}"
+                print(f"⚡ Fast path: {predicted_team} ({confidence:.1%} vote share, margin {decision['margin']:.2f})")
+            else:
+                print(f"🤖 Escalating to LLM: {decision['reason']}")
+                predicted_team, confidence, llm_reasoning = await self._predict_team(
+                    new_ticket={
+                        "key": ticket_key,
+                        "summary": summary,
+                        "description": description
+                    },
+                    similar_tickets=similar_tickets_context
+                )
+                print(f"🎯 LLM Predicted: {predicted_team} ({confidence:.1%} confidence)")
+                print(f"💭 LLM Reasoning: {llm_reasoning}")
             
             # Normalize team name for JIRA (convert team-nandi -> Team Nandi)
             jira_team_name = self._normalize_team_name(predicted_team)
@@ -726,11 +1675,20 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
             
             # Assign in JIRA if requested
             if assign_in_jira:
-                result_update = await self.jira_client.update_technical_owner(ticket_key, jira_team_name)
+                # Reuse the owner value from the fetched payload to skip the pre-read GET
+                owner_field = self.jira_client.tech_owner_field
+                if owner_field in ticket:
+                    result_update = await self.jira_client.update_technical_owner(
+                        ticket_key, jira_team_name, known_owner=ticket[owner_field], labels=self.auto_assign_labels
+                    )
+                else:
+                    result_update = await self.jira_client.update_technical_owner(
+                        ticket_key, jira_team_name, labels=self.auto_assign_labels
+                    )
                 success = result_update.get('success', False)
                 if not success:
                     error_msg = "Failed to update JIRA Technical Owner field"
-                    self.send_email_notification(ticket_key, None, error=error_msg)
+                    await asyncio.to_thread(self.send_email_notification, ticket_key, None, error=error_msg)
                     return {"status": "error", "message": error_msg}
                 print(f"✅ Updated Technical Owner in JIRA: {jira_team_name}")
             
@@ -741,18 +1699,21 @@ REASONING: The ticket involves FabricPool and cool tier issues, which are handle
                 "predicted_team": predicted_team,
                 "confidence": confidence,
                 "llm_reasoning": llm_reasoning,
+                "decision_path": decision['path'],
+                "vote_margin": decision['margin'],
+                "prototype_ranking": team_ranking,
                 "similar_tickets": similar_tickets_context[:5]  # Top 5 for email
             }
             
             # Send success email notification
-            self.send_email_notification(ticket_key, result)
+            await asyncio.to_thread(self.send_email_notification, ticket_key, result)
             
             return result
             
         except Exception as e:
             error_msg = f"Webhook processing failed: {str(e)}"
             print(f"❌ {error_msg}")
-            self.send_email_notification(ticket_key, None, error=error_msg)
+            await asyncio.to_thread(self.send_email_notification, ticket_key, None, error=error_msg)
             return {"status": "error", "message": error_msg}
 
 
@@ -3,13 +3,46 @@ Jira REST API client for ticket assignment operations.
 Handles authentication and assignment API calls.
 """
 import os
+import time
+import asyncio
 import httpx
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 from base64 import b64encode
 
+from app.rate_limiter import AdaptiveRateLimiter
+from app.retry import RetryPolicy, IDEMPOTENT_METHODS
+
 logger = logging.getLogger(__name__)
 
+# Fields needed to filter and predict a ticket (customfield_10050 = Technical
+# Owner, customfield_16202 = Hyperscaler)
+TICKET_FIELDS = [
+    "summary",
+    "description",
+    "project",
+    "issuetype",
+    "customfield_10050",
+    "customfield_16202",
+]
+
+
+# Sentinel for "caller did not say what the Technical Owner currently is"
+_UNKNOWN = object()
+
+
+def _http2_available() -> bool:
+    """Check whether the optional 'h2' package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class JiraSearchError(RuntimeError):
+    """Raised by iter_issues when a result page could not be fetched."""
+
 
 class JiraClient:
     """
@@ -21,15 +54,27 @@ class JiraClient:
         self,
         base_url: str = None,
         email: str = None,
-        api_token: str = None
+        api_token: str = None,
+        timeout: float = None,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        http2: bool = None
     ):
         """
         Initialize Jira client with credentials.
         
+        The client owns one pooled httpx.AsyncClient that is opened lazily on
+        first use (or explicitly via open() / "async with") and reused by every
+        coroutine, so keep-alive connections survive across calls.
+        
         Args:
             base_url: Jira instance base URL (e.g., https://company.atlassian.net)
             email: Email address for authentication
             api_token: Jira API token (generate at https://id.atlassian.com/manage-profile/security/api-tokens)
+            timeout: Default request timeout in seconds (env JIRA_TIMEOUT, default 30)
+            max_connections: Pool size limit (env JIRA_MAX_CONNECTIONS, default 20)
+            max_keepalive_connections: Idle connections kept open (env JIRA_MAX_KEEPALIVE, default 10)
+            http2: Enable HTTP/2 if the 'h2' package is installed (env JIRA_HTTP2, default false)
         """
         self.base_url = (base_url or os.getenv("JIRA_BASE_URL", "")).rstrip("/")
         self.email = email or os.getenv("JIRA_EMAIL", "")
@@ -70,6 +115,176 @@ class JiraClient:
             }
             logger.info("Using Basic authentication (Jira Cloud)")
         
+        # Connection pool settings
+        self.timeout = timeout or float(os.getenv("JIRA_TIMEOUT", "30"))
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("JIRA_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv("JIRA_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=30.0
+        )
+        if http2 is None:
+            http2 = os.getenv("JIRA_HTTP2", "false").lower() == "true"
+        if http2 and not _http2_available():
+            logger.warning("JIRA_HTTP2 requested but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        
+        # Writable Technical Owner field; fetched alongside TICKET_FIELDS so callers
+        # can pass its value to update_technical_owner and skip the pre-read
+        self.tech_owner_field = os.getenv("TECHNICAL_OWNER_FIELD", "customfield_15906")
+        self.ticket_fields = list(dict.fromkeys(TICKET_FIELDS + [self.tech_owner_field]))
+        
+        # Print full issue JSON from fetch_ticket (debugging only - very verbose)
+        self.debug_dump = os.getenv("JIRA_DEBUG_DUMP", "false").lower() == "true"
+        
+        # Shared by every coroutine using this client; adapts to 429/503 + Retry-After
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=float(os.getenv("JIRA_RATE_LIMIT", "5")),
+            min_rate=float(os.getenv("JIRA_RATE_LIMIT_MIN", "0.2")),
+            max_rate=float(os.getenv("JIRA_RATE_LIMIT_MAX", "20")),
+            burst=int(os.getenv("JIRA_RATE_LIMIT_BURST", "10")),
+            name="jira"
+        )
+        
+        # Retry transient failures of idempotent calls (JIRA_RETRY_* env overrides)
+        self.retry_policy = RetryPolicy.from_env("JIRA")
+        self.search_retry_policy = RetryPolicy.from_env("JIRA", deadline=120.0)
+        self.retry_counts: Dict[str, int] = {}
+        self.retry_exhausted: Dict[str, int] = {}
+        
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def open(self) -> httpx.AsyncClient:
+        """
+        Open the shared pooled HTTP client (no-op if already open).
+        
+        Returns:
+            The pooled httpx.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed:
+            if self._client_loop is loop:
+                return self._client
+            # Connections are bound to the loop that created them; a client
+            # left over from a previous asyncio.run() cannot be reused.
+            logger.debug("Discarding Jira HTTP client bound to a different event loop")
+        
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2
+        )
+        self._client_loop = loop
+        logger.info(
+            f"Opened Jira HTTP pool (max_connections={self.limits.max_connections}, "
+            f"keepalive={self.limits.max_keepalive_connections}, http2={self.http2})"
+        )
+        return self._client
+    
+    async def close(self):
+        """Close the shared pooled HTTP client and release its connections."""
+        client, self._client = self._client, None
+        self._client_loop = None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("Closed Jira HTTP pool")
+    
+    async def __aenter__(self) -> "JiraClient":
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, opening it on first use."""
+        return await self.open()
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        op: str = "request",
+        idempotent: Optional[bool] = None,
+        policy: Optional[RetryPolicy] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request over the pooled client with rate limiting and retries.
+        
+        Idempotent calls are retried on transport errors, timeouts and
+        transient statuses (429/5xx) with jittered exponential backoff, within
+        the policy's attempt and deadline bounds.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            op: Operation name used for retry metrics (e.g. 'get_issue')
+            idempotent: Whether repeating the call is safe (default: by HTTP method)
+            policy: Retry policy override (default: self.retry_policy)
+            **kwargs: Passed through to httpx.AsyncClient.request
+            
+        Returns:
+            The last httpx response (status is not checked here)
+            
+        Raises:
+            httpx.TransportError: If the final attempt failed at transport level
+        """
+        policy = policy or self.retry_policy
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        max_attempts = policy.max_attempts if idempotent else 1
+        
+        client = await self._get_client()
+        started = time.monotonic()
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            await self.rate_limiter.acquire()
+            
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                # Timeouts, connection resets, DNS failures
+                response = None
+                failure = f"{type(e).__name__}: {e}"
+                error = e
+            else:
+                self.rate_limiter.on_response(response.status_code, response.headers.get("Retry-After"))
+                if not policy.should_retry_status(response.status_code):
+                    return response
+                failure = f"HTTP {response.status_code}"
+                error = None
+            
+            delay = policy.backoff(attempt)
+            if attempt >= max_attempts or time.monotonic() - started + delay > policy.deadline:
+                if attempt > 1 or max_attempts > 1:
+                    self.retry_exhausted[op] = self.retry_exhausted.get(op, 0) + 1
+                    logger.error(f"{op}: giving up after {attempt} attempt(s) ({failure})")
+                if error is not None:
+                    raise error
+                return response
+            
+            self.retry_counts[op] = self.retry_counts.get(op, 0) + 1
+            logger.warning(f"{op}: attempt {attempt} failed ({failure}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Return client-side request metrics.
+        
+        Returns:
+            Dict with the rate limiter's current rate and counters, plus
+            per-operation retry and retries-exhausted counts
+        """
+        return {
+            "rate_limiter": self.rate_limiter.get_metrics(),
+            "retries": dict(self.retry_counts),
+            "retries_exhausted": dict(self.retry_exhausted),
+        }
+        
     async def assign_ticket(
         self,
         issue_key: str,
@@ -99,36 +314,37 @@ class JiraClient:
         logger.info(f"Assigning {issue_key} to account {account_id}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.put(
-                    url,
-                    json=payload,
-                    headers=self.headers
-                )
+            response = await self._request(
+                "PUT",
+                url,
+                op="assign_ticket",
+                json=payload,
+                headers=self.headers
+            )
+            
+            if response.status_code == 204:
+                logger.info(f"Successfully assigned {issue_key} to {account_id}")
+                return {
+                    "success": True,
+                    "status_code": 204,
+                    "message": "Ticket assigned successfully"
+                }
+            elif response.status_code == 404:
+                logger.error(f"Issue {issue_key} not found")
+                return {
+                    "success": False,
+                    "status_code": 404,
+                    "message": f"Issue {issue_key} not found"
+                }
+            else:
+                error_text = response.text
+                logger.error(f"Failed to assign {issue_key}: {response.status_code} - {error_text}")
+                return {
+                    "success": False,
+                    "status_code": response.status_code,
+                    "message": f"Assignment failed: {error_text}"
+                }
                 
-                if response.status_code == 204:
-                    logger.info(f"Successfully assigned {issue_key} to {account_id}")
-                    return {
-                        "success": True,
-                        "status_code": 204,
-                        "message": "Ticket assigned successfully"
-                    }
-                elif response.status_code == 404:
-                    logger.error(f"Issue {issue_key} not found")
-                    return {
-                        "success": False,
-                        "status_code": 404,
-                        "message": f"Issue {issue_key} not found"
-                    }
-                else:
-                    error_text = response.text
-                    logger.error(f"Failed to assign {issue_key}: {response.status_code} - {error_text}")
-                    return {
-                        "success": False,
-                        "status_code": response.status_code,
-                        "message": f"Assignment failed: {error_text}"
-                    }
-                    
         except httpx.TimeoutException:
             logger.error(f"Timeout while assigning {issue_key}")
             return {
@@ -144,48 +360,111 @@ class JiraClient:
                 "message": str(e)
             }
     
-    def fetch_ticket(self, issue_key: str) -> Optional[Dict[str, Any]]:
+    def _ticket_url(self, issue_key: str, fields: Optional[List[str]]) -> str:
+        """Build the single-issue URL projected to the requested fields."""
+        fields = fields or self.ticket_fields
+        return f"{self.base_url}/rest/api/{self.api_version}/issue/{issue_key}?fields={','.join(fields)}"
+    
+    def parse_ticket(
+        self,
+        issue_key: str,
+        data: Dict[str, Any],
+        fields: Optional[List[str]] = None,
+        debug_dump: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Flatten an issue response into the ticket dict used by the pipeline.
+        
+        Args:
+            issue_key: JIRA issue key
+            data: Raw issue JSON ({'key': ..., 'fields': {...}})
+            fields: Fields that were requested (default: self.ticket_fields)
+            debug_dump: Print the raw JSON (default: self.debug_dump)
+            
+        Returns:
+            Dict with 'key' plus one entry per requested field
+        """
+        if debug_dump is None:
+            debug_dump = self.debug_dump
+        
+        if debug_dump:
+            # Only serialize the (potentially huge) payload when explicitly asked
+            import json
+            print(f"\n{'='*80}")
+            print(f"🔍 FULL JIRA JSON RESPONSE for {issue_key}")
+            print(f"{'='*80}")
+            print(json.dumps(data, indent=2, default=str))
+            print(f"{'='*80}\n")
+        
+        raw_fields = data.get('fields') or {}
+        ticket = {'key': data.get('key', issue_key)}
+        for field in fields or self.ticket_fields:
+            if field in ('summary', 'description'):
+                ticket[field] = raw_fields.get(field) or ''
+            elif field in ('project', 'issuetype'):
+                ticket[field] = raw_fields.get(field) or {}
+            else:
+                ticket[field] = raw_fields.get(field)
+        return ticket
+    
+    async def fetch_ticket_async(
+        self,
+        issue_key: str,
+        fields: Optional[List[str]] = None,
+        debug_dump: Optional[bool] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch ticket details from JIRA over the pooled async client.
+        
+        Args:
+            issue_key: JIRA issue key (e.g., NFSAAS-12345)
+            fields: Fields to request (default: self.ticket_fields)
+            debug_dump: Print the full JSON response (default: JIRA_DEBUG_DUMP env, off)
+            
+        Returns:
+            Dict with ticket fields or None if error
+        """
+        url = self._ticket_url(issue_key, fields)
+        
+        try:
+            response = await self._request("GET", url, op="fetch_ticket", headers=self.headers)
+            
+            if response.status_code == 200:
+                return self.parse_ticket(issue_key, response.json(), fields, debug_dump)
+            else:
+                logger.error(f"Failed to fetch {issue_key}: {response.status_code}")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching {issue_key}: {str(e)}")
+            return None
+    
+    def fetch_ticket(
+        self,
+        issue_key: str,
+        fields: Optional[List[str]] = None,
+        debug_dump: Optional[bool] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Fetch ticket details from JIRA (synchronous).
         
+        Blocks the calling thread; async code should use fetch_ticket_async().
+        
         Args:
             issue_key: JIRA issue key (e.g., NFSAAS-12345)
+            fields: Fields to request (default: self.ticket_fields)
+            debug_dump: Print the full JSON response (default: JIRA_DEBUG_DUMP env, off)
             
         Returns:
             Dict with ticket fields or None if error
         """
-        # Request specific fields including custom fields
-        fields = "summary,description,project,issuetype,customfield_10050,customfield_16202"
-        url = f"{self.base_url}/rest/api/{self.api_version}/issue/{issue_key}?fields={fields}"
+        url = self._ticket_url(issue_key, fields)
         
         try:
-            import httpx
-            with httpx.Client(timeout=30.0) as client:
+            with httpx.Client(timeout=self.timeout) as client:
                 response = client.get(url, headers=self.headers)
                 
                 if response.status_code == 200:
-                    data = response.json()
-                    
-                    # DEBUG: Print full JSON response
-                    print(f"\n{'='*80}")
-                    print(f"🔍 FULL JIRA JSON RESPONSE for {issue_key}")
-                    print(f"{'='*80}")
-                    import json
-                    print(json.dumps(data, indent=2, default=str))
-                    print(f"{'='*80}\n")
-                    
-                    fields = data.get('fields', {})
-                    
-                    # Extract relevant fields
-                    return {
-                        'key': issue_key,
-                        'summary': fields.get('summary', ''),
-                        'description': fields.get('description', ''),
-                        'project': fields.get('project', {}),
-                        'issuetype': fields.get('issuetype', {}),
-                        'customfield_10050': fields.get('customfield_10050'),  # Technical Owner
-                        'customfield_16202': fields.get('customfield_16202'),  # Hyperscaler (Azure)
-                    }
+                    return self.parse_ticket(issue_key, response.json(), fields, debug_dump)
                 else:
                     logger.error(f"Failed to fetch {issue_key}: {response.status_code}")
                     return None
@@ -207,42 +486,59 @@ class JiraClient:
             Technical Owner value or None if empty/not found
         """
         # Technical Owner field ID from your environment
-        tech_owner_field = os.getenv("TECHNICAL_OWNER_FIELD", "customfield_15906")
+        tech_owner_field = self.tech_owner_field
         
         url = f"{self.base_url}/rest/api/{self.api_version}/issue/{issue_key}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(
-                    url, 
-                    headers=self.headers,
-                    params={"fields": tech_owner_field}
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    tech_owner = data.get("fields", {}).get(tech_owner_field)
-                    return tech_owner if tech_owner else None
-                else:
-                    logger.error(f"Failed to get technical owner for {issue_key}: {response.status_code}")
-                    return None
-            except Exception as e:
-                logger.error(f"Exception getting technical owner: {e}")
+        try:
+            response = await self._request(
+                "GET",
+                url,
+                op="get_technical_owner",
+                headers=self.headers,
+                params={"fields": tech_owner_field}
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                tech_owner = data.get("fields", {}).get(tech_owner_field)
+                return tech_owner if tech_owner else None
+            else:
+                logger.error(f"Failed to get technical owner for {issue_key}: {response.status_code}")
                 return None
+        except Exception as e:
+            logger.error(f"Exception getting technical owner: {e}")
+            return None
 
-    async def update_technical_owner(self, issue_key: str, team_name: str) -> Dict[str, Any]:
+    async def update_technical_owner(
+        self,
+        issue_key: str,
+        team_name: str,
+        known_owner: Any = _UNKNOWN,
+        labels: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Update the Technical Owner field for a Jira issue.
         
+        By default the current value is read first so an existing owner is
+        never overwritten. Callers that just fetched the issue can pass the
+        value they saw as known_owner to skip that extra GET.
+        
         Args:
             issue_key: The Jira issue key (e.g., 'NFSAAS-12345')
             team_name: The team name to assign (e.g., 'Team Himalaya')
+            known_owner: Current Technical Owner value as already fetched by the
+                         caller (None/empty = unset). Omit to read it from Jira.
+            labels: Labels to add in the same PUT (optional)
             
         Returns:
             Dict containing success status and details
         """
         # Check if Technical Owner is already set
-        current_owner = await self.get_technical_owner(issue_key)
+        if known_owner is _UNKNOWN:
+            current_owner = await self.get_technical_owner(issue_key)
+        else:
+            current_owner = known_owner or None
         if current_owner:
             logger.info(f"Technical Owner already set for {issue_key}: {current_owner}")
             return {
@@ -256,41 +552,44 @@ class JiraClient:
         
         payload = {
             "fields": {
-                "customfield_15906": {"value": team_name}  # Technical Owner field with value object
+                self.tech_owner_field: {"value": team_name}  # Technical Owner field with value object
             }
         }
+        if labels:
+            payload["update"] = {"labels": [{"add": label} for label in labels]}
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.put(
-                    url,
-                    json=payload,
-                    headers=self.headers
-                )
+            response = await self._request(
+                "PUT",
+                url,
+                op="update_technical_owner",
+                json=payload,
+                headers=self.headers
+            )
+            
+            if response.status_code == 204:
+                logger.info(f"Successfully updated Technical Owner for {issue_key} to {team_name}")
+                return {
+                    "success": True,
+                    "status_code": 204,
+                    "message": f"Technical Owner updated to {team_name}"
+                }
+            elif response.status_code == 404:
+                logger.error(f"Issue {issue_key} not found")
+                return {
+                    "success": False,
+                    "status_code": 404,
+                    "message": f"Issue {issue_key} not found"
+                }
+            else:
+                error_text = response.text
+                logger.error(f"Failed to update Technical Owner for {issue_key}: {response.status_code} - {error_text}")
+                return {
+                    "success": False,
+                    "status_code": response.status_code,
+                    "message": f"Update failed: {error_text}"
+                }
                 
-                if response.status_code == 204:
-                    logger.info(f"Successfully updated Technical Owner for {issue_key} to {team_name}")
-                    return {
-                        "success": True,
-                        "status_code": 204,
-                        "message": f"Technical Owner updated to {team_name}"
-                    }
-                elif response.status_code == 404:
-                    logger.error(f"Issue {issue_key} not found")
-                    return {
-                        "success": False,
-                        "status_code": 404,
-                        "message": f"Issue {issue_key} not found"
-                    }
-                else:
-                    error_text = response.text
-                    logger.error(f"Failed to update Technical Owner for {issue_key}: {response.status_code} - {error_text}")
-                    return {
-                        "success": False,
-                        "status_code": response.status_code,
-                        "message": f"Update failed: {error_text}"
-                    }
-                    
         except httpx.TimeoutException:
             logger.error(f"Timeout while updating Technical Owner for {issue_key}")
             return {
@@ -332,29 +631,30 @@ class JiraClient:
         logger.info(f"Adding label '{label}' to {issue_key}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.put(
-                    url,
-                    json=payload,
-                    headers=self.headers
-                )
+            response = await self._request(
+                "PUT",
+                url,
+                op="add_label",
+                json=payload,
+                headers=self.headers
+            )
+            
+            if response.status_code == 204:
+                logger.info(f"Successfully added label '{label}' to {issue_key}")
+                return {
+                    "success": True,
+                    "status_code": 204,
+                    "message": f"Label '{label}' added successfully"
+                }
+            else:
+                error_text = response.text
+                logger.error(f"Failed to add label to {issue_key}: {response.status_code} - {error_text}")
+                return {
+                    "success": False,
+                    "status_code": response.status_code,
+                    "message": f"Failed to add label: {error_text}"
+                }
                 
-                if response.status_code == 204:
-                    logger.info(f"Successfully added label '{label}' to {issue_key}")
-                    return {
-                        "success": True,
-                        "status_code": 204,
-                        "message": f"Label '{label}' added successfully"
-                    }
-                else:
-                    error_text = response.text
-                    logger.error(f"Failed to add label to {issue_key}: {response.status_code} - {error_text}")
-                    return {
-                        "success": False,
-                        "status_code": response.status_code,
-                        "message": f"Failed to add label: {error_text}"
-                    }
-                    
         except Exception as e:
             logger.error(f"Error adding label to {issue_key}: {str(e)}")
             return {
@@ -376,15 +676,14 @@ class JiraClient:
         url = f"{self.base_url}/rest/api/{self.api_version}/issue/{issue_key}"
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, headers=self.headers)
+            response = await self._request("GET", url, op="get_issue", headers=self.headers)
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"Failed to get issue {issue_key}: {response.status_code}")
+                return None
                 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Failed to get issue {issue_key}: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error fetching issue {issue_key}: {str(e)}")
             return None
@@ -393,18 +692,28 @@ class JiraClient:
         self,
         jql: str,
         max_results: int = 50,
-        fields: list = None
-    ) -> List[Dict[str, Any]]:
+        fields: list = None,
+        start_at: int = 0,
+        validate_query: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Search for issues using JQL (Jira Query Language).
         
+        Returns a single page; use iter_issues() to walk every match.
+        
         Args:
             jql: JQL query string (e.g., 'assignee = currentUser() AND status = Open')
             max_results: Maximum number of results to return (default 50)
             fields: List of fields to include (default: all fields)
+            start_at: Index of the first result to return (for paging)
+            validate_query: Jira validateQuery mode ('strict', 'warn', 'none');
+                            'warn' keeps unknown issue keys from failing the query.
+                            API v2 (Data Center) only takes a boolean, so there
+                            anything but 'strict' is sent as false.
             
         Returns:
-            List of issue dictionaries
+            Dict with 'issues', 'total', 'maxResults' and 'startAt'
+            (on failure: empty 'issues' and an 'error' message)
             
         Example:
             issues = await client.search_issues(
@@ -421,44 +730,180 @@ class JiraClient:
         
         payload = {
             "jql": jql,
+            "startAt": start_at,
             "maxResults": max_results,
             "fields": fields
         }
+        if validate_query:
+            if self.api_version == "2":
+                payload["validateQuery"] = validate_query == "strict"
+            else:
+                payload["validateQuery"] = validate_query
         
-        logger.info(f"Searching issues with JQL: {jql[:100]}...")
+        logger.info(f"Searching issues (startAt={start_at}) with JQL: {jql[:100]}...")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers=self.headers
-                )
+            response = await self._request(
+                "POST",
+                url,
+                op="search_issues",
+                idempotent=True,  # Read-only POST
+                policy=self.search_retry_policy,
+                json=payload,
+                headers=self.headers,
+                timeout=max(self.timeout, 60.0)  # Searches are slower than single-issue calls
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                issues = data.get('issues', [])
+                total = data.get('total', 0)
+                
+                logger.info(f"Found {len(issues)} issues (total matching: {total})")
+                # Return full response with issues and total
+                return {
+                    'issues': issues,
+                    'total': total,
+                    'maxResults': data.get('maxResults', max_results),
+                    'startAt': data.get('startAt', 0)
+                }
+            else:
+                error_text = response.text
+                logger.error(f"Failed to search issues: {response.status_code} - {error_text}")
+                return {'issues': [], 'total': 0, 'error': f"HTTP {response.status_code}: {error_text[:200]}"}
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    issues = data.get('issues', [])
-                    total = data.get('total', 0)
-                    
-                    logger.info(f"Found {len(issues)} issues (total matching: {total})")
-                    # Return full response with issues and total
-                    return {
-                        'issues': issues,
-                        'total': total,
-                        'maxResults': data.get('maxResults', max_results),
-                        'startAt': data.get('startAt', 0)
-                    }
-                else:
-                    error_text = response.text
-                    logger.error(f"Failed to search issues: {response.status_code} - {error_text}")
-                    return {'issues': [], 'total': 0}
-                    
         except httpx.TimeoutException:
             logger.error("Timeout while searching issues")
-            return {'issues': [], 'total': 0}
+            return {'issues': [], 'total': 0, 'error': "Request timeout"}
         except Exception as e:
             logger.error(f"Error searching issues: {str(e)}")
-            return {'issues': [], 'total': 0}
+            return {'issues': [], 'total': 0, 'error': str(e)}
+    
+    async def iter_issues(
+        self,
+        jql: str,
+        fields: list = None,
+        page_size: int = 100,
+        max_issues: Optional[int] = None,
+        page_totals: Optional[List[int]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every issue matching a JQL query, one page at a time.
+        
+        The next page is requested while the caller is still consuming the
+        current one, so at most two pages are held in memory.
+        
+        Args:
+            jql: JQL query string (use a stable ORDER BY for consistent paging)
+            fields: List of fields to include (same default as search_issues)
+            page_size: Issues requested per page (default 100)
+            max_issues: Stop after this many issues (default: no limit)
+            page_totals: If given, each page's reported total is appended, so
+                         callers can tell the result set changed mid-walk
+                         (offset paging may then have skipped an issue)
+            
+        Yields:
+            Issue dictionaries as returned by the search API
+            
+        Raises:
+            JiraSearchError: If a page fails, so callers never mistake a
+                             failed search for a complete (empty) one
+            
+        Example:
+            async for issue in client.iter_issues('project = PROJ ORDER BY created ASC'):
+                print(issue['key'])
+        """
+        def _fetch(start: int) -> "asyncio.Task":
+            size = page_size if max_issues is None else min(page_size, max_issues - start)
+            return asyncio.create_task(
+                self.search_issues(jql, max_results=size, fields=fields, start_at=start)
+            )
+        
+        start_at = 0
+        next_page = _fetch(start_at)
+        
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                
+                if page.get('error'):
+                    raise JiraSearchError(f"Search failed at startAt={start_at}: {page['error']}")
+                
+                issues = page.get('issues', [])
+                start_at += len(issues)
+                total = page.get('total', 0)
+                if page_totals is not None:
+                    page_totals.append(total)
+                if max_issues is not None:
+                    total = min(total, max_issues)
+                
+                # Prefetch the following page before handing this one over
+                if issues and start_at < total:
+                    next_page = _fetch(start_at)
+                
+                for issue in issues:
+                    yield issue
+        finally:
+            # Caller stopped early (break/exception) - drop the in-flight request
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+    
+    async def get_issues_bulk(
+        self,
+        keys: List[str],
+        fields: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch many issues by key with a few `key in (...)` searches.
+        
+        Keys are split into chunks that are searched concurrently over the
+        pooled client, replacing one GET per ticket.
+        
+        Args:
+            keys: Jira issue keys (duplicates are ignored)
+            fields: Fields to request (default: self.ticket_fields)
+            chunk_size: Keys per JQL query (env JIRA_BULK_CHUNK_SIZE, default 50)
+            
+        Returns:
+            Dict mapping issue key -> ticket dict (same shape as fetch_ticket).
+            Keys that were not found or failed to fetch are absent.
+            
+        Example:
+            tickets = await client.get_issues_bulk(["NFSAAS-1", "NFSAAS-2"])
+            summary = tickets["NFSAAS-1"]["summary"]
+        """
+        keys = list(dict.fromkeys(k for k in keys if k))
+        if not keys:
+            return {}
+        
+        fields = fields or self.ticket_fields
+        chunk_size = chunk_size or int(os.getenv("JIRA_BULK_CHUNK_SIZE", "50"))
+        chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+        
+        logger.info(f"Bulk fetching {len(keys)} issues in {len(chunks)} request(s)")
+        
+        pages = await asyncio.gather(*[
+            self.search_issues(
+                jql=f"key in ({', '.join(chunk)})",
+                max_results=len(chunk),
+                fields=fields,
+                validate_query="warn"
+            )
+            for chunk in chunks
+        ])
+        
+        tickets = {}
+        for page in pages:
+            for issue in page.get('issues', []):
+                tickets[issue['key']] = self.parse_ticket(issue['key'], issue, fields, debug_dump=False)
+        
+        missing = len(keys) - len(tickets)
+        if missing:
+            logger.warning(f"Bulk fetch returned {len(tickets)}/{len(keys)} issues ({missing} missing)")
+        
+        return tickets
     
     async def get_user_info(self, account_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -479,19 +924,20 @@ class JiraClient:
             params = {"accountId": account_id}
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    url,
-                    params=params,
-                    headers=self.headers
-                )
+            response = await self._request(
+                "GET",
+                url,
+                op="get_user_info",
+                params=params,
+                headers=self.headers
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"Failed to get user {account_id}: {response.status_code}")
+                return None
                 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Failed to get user {account_id}: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error fetching user {account_id}: {str(e)}")
             return None
@@ -508,9 +954,16 @@ class JiraClient:
         Returns:
             True if successful, False otherwise
         """
-        import asyncio
+        async def _update_and_close():
+            # asyncio.run() creates a fresh loop each time, so don't leave a
+            # pooled client behind that is bound to a loop about to close
+            try:
+                return await self.update_technical_owner(issue_key, team_name)
+            finally:
+                await self.close()
+        
         try:
-            result = asyncio.run(self.update_technical_owner(issue_key, team_name))
+            result = asyncio.run(_update_and_close())
             return result.get('success', False)
         except Exception as e:
             logger.error(f"Error in assign_technical_owner: {e}")
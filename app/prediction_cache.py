@@ -0,0 +1,120 @@
+"""
+Persistent cache of LLM team predictions.
+Keyed by the normalized ticket text, the neighbor ids shown to the model and
+the model/prompt/index versions, so retries and re-runs with identical inputs
+skip the LLM call entirely.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.embedding_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "data" / "prediction_cache.db"
+
+
+class PredictionCache:
+    """
+    SQLite-backed prediction store with a TTL.
+
+    Entries expire after ttl_hours; clear() drops everything and is called
+    after retraining, when old predictions no longer reflect the index.
+    """
+
+    def __init__(self, path: str = None, ttl_hours: float = None):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file (env PREDICTION_CACHE_PATH, default data/prediction_cache.db)
+            ttl_hours: Entry lifetime (env PREDICTION_CACHE_TTL_HOURS, default 24)
+        """
+        self.path = Path(path or os.getenv("PREDICTION_CACHE_PATH", str(DEFAULT_CACHE_PATH)))
+        if ttl_hours is None:
+            ttl_hours = float(os.getenv("PREDICTION_CACHE_TTL_HOURS", "24"))
+        self.ttl_seconds = ttl_hours * 3600
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                cache_key  TEXT PRIMARY KEY,
+                prediction TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.prune()
+
+    @staticmethod
+    def make_key(text: str, neighbor_ids: List[str], model: str, prompt_version: str, index_version: str = "") -> str:
+        """
+        Cache key for one prediction request.
+
+        Args:
+            text: Ticket text the prompt is built from
+            neighbor_ids: Similar-ticket ids in prompt order
+            model: LLM model name
+            prompt_version: Version of the prompt template
+            index_version: Version of the trained collection the neighbors came from
+        """
+        parts = [normalize_text(text), ",".join(neighbor_ids), model, prompt_version, index_version]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached prediction, or None."""
+        row = self._conn.execute(
+            "SELECT prediction, created_at FROM predictions WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, prediction: Dict[str, Any]):
+        """Store a prediction (overwrites an older entry for the same key)."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO predictions (cache_key, prediction, created_at) VALUES (?, ?, ?)",
+            (cache_key, json.dumps(prediction), time.time())
+        )
+        self._conn.commit()
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were removed."""
+        cursor = self._conn.execute(
+            "DELETE FROM predictions WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> int:
+        """Drop every entry (after retraining); returns how many were removed."""
+        cursor = self._conn.execute("DELETE FROM predictions")
+        self._conn.commit()
+        logger.info(f"Cleared {cursor.rowcount} cached prediction(s)")
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
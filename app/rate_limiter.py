@@ -0,0 +1,156 @@
+"""
+Adaptive token-bucket rate limiter for outbound API calls.
+Backs off when the server answers 429/503 and speeds up again while it doesn't.
+"""
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "slow down"
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds.
+
+    Args:
+        value: Header value - either delay seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if missing/unparseable
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to server feedback (AIMD).
+
+    Every successful response raises the rate by a fixed step up to max_rate;
+    every 429/503 multiplies it down toward min_rate and, when the server
+    sends Retry-After, pauses all callers until that time. One instance is
+    meant to be shared by every coroutine talking to the same server.
+
+    The bucket may go negative: each caller reserves a token immediately and
+    sleeps off the debt, so no lock is needed inside a single event loop.
+    No tokens accrue during a Retry-After pause; the debt is repaid from the
+    end of the pause, so queued callers resume spaced out instead of all at once.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        burst: int = 10,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        name: str = "rate_limiter"
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Initial requests per second
+            min_rate: Lowest rate after repeated throttling
+            max_rate: Highest rate reached while the server is healthy
+            burst: Bucket capacity (requests that may go out back-to-back)
+            increase_step: Requests/second added after each successful response
+            decrease_factor: Multiplier applied to the rate on 429/503
+            name: Label used in log messages
+        """
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.burst = max(1, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.name = name
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        # Metrics
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last refill (or the end of a pause)."""
+        elapsed = now - max(self._last_refill, self._blocked_until)
+        self._last_refill = now
+        if elapsed > 0:
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        now = time.monotonic()
+        self._refill(now)
+
+        # Reserve a token now; a negative balance is debt paid off by sleeping
+        self._tokens -= 1
+        wait = max(self._blocked_until - now, 0.0) + max(-self._tokens / self.rate, 0.0)
+
+        self.requests += 1
+        if wait > 0:
+            self.total_wait_seconds += wait
+            await asyncio.sleep(wait)
+
+    def on_response(self, status_code: int, retry_after: Optional[str] = None):
+        """
+        Feed a response back so the rate can adapt.
+
+        Args:
+            status_code: HTTP status of the response
+            retry_after: Raw Retry-After header value, if any
+        """
+        if status_code in THROTTLE_STATUS_CODES:
+            self.throttled += 1
+            old_rate = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+            delay = parse_retry_after(retry_after)
+            if delay:
+                now = time.monotonic()
+                self._refill(now)
+                self._blocked_until = max(self._blocked_until, now + delay)
+                # Don't let saved-up burst capacity fire all at once when the pause ends
+                self._tokens = min(self._tokens, 0.0)
+
+            logger.warning(
+                f"{self.name}: server returned {status_code}, rate {old_rate:.2f} -> {self.rate:.2f} req/s"
+                + (f", pausing {delay:.1f}s (Retry-After)" if delay else "")
+            )
+        elif status_code < 500:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return current rate and counters."""
+        return {
+            "rate": round(self.rate, 3),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
@@ -0,0 +1,88 @@
+"""
+Retry policy with exponential backoff and jitter for outbound API calls.
+"""
+import os
+import random
+from typing import Tuple
+
+# Transient HTTP statuses worth retrying
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Methods that are safe to repeat without side effects piling up
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class RetryPolicy:
+    """
+    Bounded retry schedule: capped exponential backoff with full jitter.
+
+    A call is retried at most max_attempts - 1 times and never past
+    deadline seconds from the first attempt.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 45.0,
+        retry_statuses: Tuple[int, ...] = RETRYABLE_STATUS_CODES
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Backoff before the first retry (seconds, before jitter)
+            max_delay: Upper bound for a single backoff (seconds)
+            deadline: Give up once this many seconds have passed since the first attempt
+            retry_statuses: HTTP status codes treated as transient
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+
+    @classmethod
+    def from_env(cls, prefix: str, **overrides) -> "RetryPolicy":
+        """
+        Build a policy from <prefix>_RETRY_* environment variables.
+
+        Args:
+            prefix: Variable prefix, e.g. 'JIRA' reads JIRA_RETRY_MAX_ATTEMPTS
+            **overrides: Defaults used when a variable is not set
+
+        Returns:
+            RetryPolicy
+        """
+        defaults = {
+            "max_attempts": 4,
+            "base_delay": 0.5,
+            "max_delay": 8.0,
+            "deadline": 45.0,
+        }
+        defaults.update(overrides)
+        return cls(
+            max_attempts=int(os.getenv(f"{prefix}_RETRY_MAX_ATTEMPTS", defaults["max_attempts"])),
+            base_delay=float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", defaults["base_delay"])),
+            max_delay=float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", defaults["max_delay"])),
+            deadline=float(os.getenv(f"{prefix}_RETRY_DEADLINE", defaults["deadline"])),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before the given retry (full jitter).
+
+        Args:
+            attempt: 1 for the first retry, 2 for the second, ...
+
+        Returns:
+            Seconds to sleep
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """Whether an HTTP status is considered transient."""
+        return status_code in self.retry_statuses
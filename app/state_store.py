@@ -0,0 +1,212 @@
+"""
+Durable scheduler state: processed tickets and the polling watermark.
+Backed by a local SQLite file so restarts neither reprocess nor miss tickets.
+"""
+import os
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "scheduler_state.db"
+
+# Outcomes that mean "done - never pick this ticket up again"
+FINAL_STATUSES = ("success", "skipped")
+
+
+class ProcessedTicketStore:
+    """
+    SQLite-backed record of processed tickets plus named watermarks.
+
+    Processed keys are mirrored in memory at open time so membership checks
+    are O(1) dict lookups; SQLite is only touched on writes. Rows older than
+    the retention window are pruned unless the ticket may still match the
+    scheduler's polling window (see prune()).
+    """
+
+    def __init__(
+        self,
+        db_path: str = None,
+        retention_days: int = None,
+        failed_retry_minutes: int = None,
+        max_attempts: int = None
+    ):
+        """
+        Open (or create) the state database.
+
+        Args:
+            db_path: SQLite file (env AUTO_ASSIGN_STATE_DB, default data/scheduler_state.db)
+            retention_days: Keep processed rows this long (env AUTO_ASSIGN_STATE_RETENTION_DAYS, default 7)
+            failed_retry_minutes: Retry failed tickets after this long (env AUTO_ASSIGN_RETRY_FAILED_MINUTES, default 60)
+            max_attempts: Give up on a failing ticket after this many attempts (env AUTO_ASSIGN_MAX_ATTEMPTS, default 3)
+        """
+        self.db_path = Path(db_path or os.getenv("AUTO_ASSIGN_STATE_DB", str(DEFAULT_DB_PATH)))
+        self.retention_days = retention_days or int(os.getenv("AUTO_ASSIGN_STATE_RETENTION_DAYS", "7"))
+        if failed_retry_minutes is None:
+            failed_retry_minutes = int(os.getenv("AUTO_ASSIGN_RETRY_FAILED_MINUTES", "60"))
+        self.failed_retry_after = timedelta(minutes=failed_retry_minutes)
+        self.max_attempts = max_attempts or int(os.getenv("AUTO_ASSIGN_MAX_ATTEMPTS", "3"))
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS processed_tickets (
+                ticket_key   TEXT PRIMARY KEY,
+                status       TEXT NOT NULL,
+                detail       TEXT,
+                first_seen   TEXT NOT NULL,
+                processed_at TEXT NOT NULL,
+                attempts     INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE INDEX IF NOT EXISTS idx_processed_at ON processed_tickets (processed_at);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                name  TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+        self.prune()
+
+        # key -> (status, processed_at, attempts)
+        self._cache: Dict[str, tuple] = {
+            key: (status, datetime.fromisoformat(processed_at), attempts)
+            for key, status, processed_at, attempts in self._conn.execute(
+                "SELECT ticket_key, status, processed_at, attempts FROM processed_tickets"
+            )
+        }
+        logger.info(f"Loaded {len(self._cache)} processed ticket(s) from {self.db_path}")
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, ticket_key: str) -> bool:
+        return self.is_processed(ticket_key)
+
+    def is_processed(self, ticket_key: str) -> bool:
+        """
+        Whether a ticket should be left alone this run.
+
+        Successful and skipped tickets are final; failed ones become eligible
+        again once failed_retry_minutes have passed, up to max_attempts.
+        """
+        entry = self._cache.get(ticket_key)
+        if entry is None:
+            return False
+        status, processed_at, attempts = entry
+        if status in FINAL_STATUSES or attempts >= self.max_attempts:
+            return True
+        return datetime.now() - processed_at < self.failed_retry_after
+
+    def get(self, ticket_key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored row for a ticket, or None."""
+        row = self._conn.execute(
+            "SELECT ticket_key, status, detail, first_seen, processed_at, attempts "
+            "FROM processed_tickets WHERE ticket_key = ?",
+            (ticket_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("ticket_key", "status", "detail", "first_seen", "processed_at", "attempts"), row))
+
+    def record(self, ticket_key: str, status: str, detail: str = None):
+        """
+        Record the outcome of processing a ticket.
+
+        Args:
+            ticket_key: JIRA ticket key
+            status: Result status ('success', 'skipped', 'error', ...)
+            detail: Short description (team, skip reason or error message)
+        """
+        now = datetime.now()
+        self._conn.execute(
+            """
+            INSERT INTO processed_tickets (ticket_key, status, detail, first_seen, processed_at, attempts)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT(ticket_key) DO UPDATE SET
+                status = excluded.status,
+                detail = excluded.detail,
+                processed_at = excluded.processed_at,
+                attempts = processed_tickets.attempts + 1
+            """,
+            (ticket_key, status, detail, now.isoformat(), now.isoformat())
+        )
+        self._conn.commit()
+        previous = self._cache.get(ticket_key)
+        self._cache[ticket_key] = (status, now, previous[2] + 1 if previous else 1)
+
+    def retry_candidates(self) -> List[str]:
+        """
+        Failed tickets whose cool-down has passed and attempts remain.
+
+        Returns:
+            Ticket keys, oldest failure first
+        """
+        cutoff = (datetime.now() - self.failed_retry_after).isoformat()
+        placeholders = ", ".join("?" for _ in FINAL_STATUSES)
+        rows = self._conn.execute(
+            f"SELECT ticket_key FROM processed_tickets "
+            f"WHERE status NOT IN ({placeholders}) AND processed_at <= ? AND attempts < ? "
+            f"ORDER BY processed_at",
+            (*FINAL_STATUSES, cutoff, self.max_attempts)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_watermark(self, name: str = "poll") -> Optional[datetime]:
+        """Return a stored watermark, or None if never set."""
+        row = self._conn.execute("SELECT value FROM watermarks WHERE name = ?", (name,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def set_watermark(self, value: datetime, name: str = "poll"):
+        """Persist a watermark."""
+        self._conn.execute(
+            "INSERT INTO watermarks (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, value.isoformat())
+        )
+        self._conn.commit()
+
+    def prune(self, window_start: Optional[datetime] = None) -> int:
+        """
+        Delete processed rows older than the retention window.
+
+        Rows first seen at or after window_start are kept regardless of age:
+        such a ticket was created after window_start, so the polling JQL
+        ('created >= window_start') can still return it, and forgetting it
+        would reprocess it from scratch - including tickets that already
+        used up max_attempts.
+
+        Args:
+            window_start: Start of the polling window (default: the stored 'poll' watermark)
+
+        Returns:
+            Number of rows removed
+        """
+        if window_start is None:
+            window_start = self.get_watermark()
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        condition = "processed_at < ?"
+        params = [cutoff]
+        if window_start is not None:
+            condition += " AND first_seen < ?"
+            params.append(window_start.isoformat())
+
+        removed = [row[0] for row in self._conn.execute(
+            f"SELECT ticket_key FROM processed_tickets WHERE {condition}", params
+        )]
+        if removed:
+            self._conn.execute(f"DELETE FROM processed_tickets WHERE {condition}", params)
+            self._conn.commit()
+            if hasattr(self, "_cache"):
+                for key in removed:
+                    self._cache.pop(key, None)
+            logger.info(f"Pruned {len(removed)} processed ticket(s) older than {self.retention_days} days")
+        return len(removed)
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
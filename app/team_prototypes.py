@@ -0,0 +1,196 @@
+"""
+Per-team prototype index: a centroid plus a few medoids for every team.
+Scoring a ticket embedding against all prototypes is one small matrix
+product, which gives a near-free baseline prediction and a margin that
+tells later stages how clear-cut the ticket is.
+"""
+import os
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.vector_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROTOTYPE_DIR = Path(__file__).parent.parent / "data" / "team_prototypes"
+
+
+def _medoids(vectors: np.ndarray, count: int, iterations: int = 5) -> np.ndarray:
+    """
+    Pick up to count representative members of one team.
+
+    Runs a few rounds of spherical k-means (farthest-point seeded) and returns
+    the member closest to each cluster center, so every medoid is a real ticket.
+    """
+    count = min(count, len(vectors))
+    if count <= 0:
+        return np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+    # Farthest-point seeding: deterministic and spreads seeds over the cluster
+    seeds = [0]
+    best = vectors @ vectors[0]
+    for _ in range(1, count):
+        seeds.append(int(np.argmin(best)))
+        best = np.maximum(best, vectors @ vectors[seeds[-1]])
+    centers = vectors[seeds]
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centers.T, axis=1)
+        for c in range(count):
+            members = vectors[assignment == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+        centers = normalize_rows(centers)
+
+    nearest = np.argmax(centers @ vectors.T, axis=1)
+    return vectors[np.unique(nearest)]
+
+
+class PrototypeSnapshot(NamedTuple):
+    """One consistent, immutable set of prototypes."""
+    teams: List[str]
+    team_sizes: List[int]
+    prototypes: np.ndarray
+    prototype_team: np.ndarray
+
+
+class TeamPrototypeIndex:
+    """
+    Centroid + medoid prototypes per team, persisted as one .npz file.
+
+    A team's score is its best cosine similarity over its prototypes;
+    rank_teams() returns teams best-first with each team's margin over
+    the next one.
+
+    Like LocalVectorIndex, the prototypes are published as a single snapshot
+    so a rebuild in a worker thread never mixes with a ranking on the loop.
+    """
+
+    def __init__(self, collection_name: str, path: str = None, medoids_per_team: int = None):
+        """
+        Args:
+            collection_name: Chroma collection the prototypes are built from
+            path: .npz file (env TEAM_PROTOTYPE_DIR, default data/team_prototypes/<collection>.npz)
+            medoids_per_team: Medoids kept per team besides the centroid (env TEAM_PROTOTYPE_MEDOIDS, default 3)
+        """
+        base = Path(os.getenv("TEAM_PROTOTYPE_DIR", str(DEFAULT_PROTOTYPE_DIR)))
+        self.path = Path(path) if path else base / f"{collection_name}.npz"
+        if medoids_per_team is None:
+            medoids_per_team = int(os.getenv("TEAM_PROTOTYPE_MEDOIDS", "3"))
+        self.medoids_per_team = medoids_per_team
+
+        self.snapshot: Optional[PrototypeSnapshot] = None
+        self._loaded_mtime = None
+
+    @property
+    def is_loaded(self) -> bool:
+        snapshot = self.snapshot
+        return snapshot is not None and len(snapshot.teams) > 0
+
+    def load(self) -> bool:
+        """Load prototypes from disk; returns True if found."""
+        if not self.path.exists():
+            return False
+        mtime = self.path.stat().st_mtime
+        with np.load(self.path, allow_pickle=False) as data:
+            snapshot = PrototypeSnapshot(
+                teams=data["teams"].tolist(),
+                team_sizes=data["team_sizes"].tolist(),
+                prototypes=data["prototypes"],
+                prototype_team=data["prototype_team"],
+            )
+        self.snapshot = snapshot
+        self._loaded_mtime = mtime
+        logger.info(f"Loaded {len(snapshot.prototypes)} prototypes for {len(snapshot.teams)} teams from {self.path}")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload when another process (e.g. training) rebuilt the prototypes."""
+        if self.path.exists() and self.path.stat().st_mtime != self._loaded_mtime:
+            return self.load()
+        return False
+
+    def build(self, vectors: np.ndarray, teams: List[str]) -> int:
+        """
+        Rebuild prototypes from labelled vectors and persist them.
+
+        Args:
+            vectors: Ticket embeddings, one row per ticket
+            teams: Team label per row
+
+        Returns:
+            Number of teams indexed
+        """
+        start = time.time()
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        labels = np.asarray(teams)
+
+        team_names, sizes, prototypes, owners = [], [], [], []
+        for team in sorted(set(teams)):
+            members = vectors[labels == team]
+            centroid = normalize_rows(members.mean(axis=0, keepdims=True))
+            team_prototypes = np.vstack([centroid, _medoids(members, self.medoids_per_team)])
+
+            team_names.append(team)
+            sizes.append(len(members))
+            prototypes.append(team_prototypes)
+            owners.extend([len(team_names) - 1] * len(team_prototypes))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # np.savez appends .npz unless the name already ends with it
+        tmp_path = self.path.with_name(self.path.stem + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            teams=np.array(team_names, dtype=str),
+            team_sizes=np.array(sizes, dtype=np.int64),
+            prototypes=np.vstack(prototypes).astype(np.float32) if prototypes else np.zeros((0, vectors.shape[1]), np.float32),
+            prototype_team=np.array(owners, dtype=np.int64),
+        )
+        os.replace(tmp_path, self.path)
+
+        self.load()
+        logger.info(f"Built team prototypes for {len(team_names)} teams in {time.time() - start:.2f}s")
+        return len(team_names)
+
+    def rank_teams_many(self, queries: List[List[float]], top_n: int = None) -> List[List[Dict[str, Any]]]:
+        """
+        Rank teams for many embeddings with one matrix product.
+
+        Args:
+            queries: Query embeddings
+            top_n: Keep only the best top_n teams (default all)
+
+        Returns:
+            Per query, a best-first list of {'team', 'score', 'margin'} where
+            score is the best prototype cosine similarity and margin is the
+            gap to the next-ranked team (0 for the last one)
+        """
+        if len(queries) == 0:
+            return []
+        snapshot = self.snapshot
+        if snapshot is None or len(snapshot.teams) == 0:
+            return [[] for _ in queries]
+
+        q = normalize_rows(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+        similarities = q @ snapshot.prototypes.T
+
+        # Best prototype per team
+        team_scores = np.full((len(q), len(snapshot.teams)), -np.inf, dtype=np.float32)
+        np.maximum.at(team_scores, (slice(None), snapshot.prototype_team), similarities)
+
+        rankings = []
+        for scores in team_scores:
+            order = np.argsort(-scores)
+            ranked = [{"team": snapshot.teams[i], "score": float(scores[i])} for i in order]
+            for current, following in zip(ranked, ranked[1:] + [None]):
+                current["margin"] = current["score"] - following["score"] if following else 0.0
+            rankings.append(ranked[:top_n] if top_n else ranked)
+        return rankings
+
+    def rank_teams(self, query: List[float], top_n: int = None) -> List[Dict[str, Any]]:
+        """Rank teams for one embedding (see rank_teams_many)."""
+        return self.rank_teams_many([query], top_n=top_n)[0]
@@ -0,0 +1,163 @@
+"""
+Normalization of Jira ticket text before embedding.
+Strips Jira wiki markup and log noise (IDs, timestamps, repeated lines, long
+stack traces) so embeddings focus on the actual problem description.
+"""
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+
+# (name, pattern, replacement) - applied in order to the whole text.
+# Markup is removed first so masks see plain text.
+_MARKUP_RULES = [
+    ("block_markers", r"\{(?:code|noformat|quote|panel|color)(?::[^}]*)?\}", "\n"),
+    ("images", r"![^!\s][^!\n]*!", ""),
+    ("mentions", r"\[~(?:accountid:)?[^\]]+\]", "<user>"),
+    ("links", r"\[([^|\]\n]+)\|[^\]\n]+\]", r"\1"),
+    ("bare_links", r"\[((?:https?|mailto):[^\]\n]+)\]", r"\1"),
+    ("headings", r"(?m)^\s*h[1-6]\.\s*", ""),
+    ("monospace", r"\{\{(.*?)\}\}", r"\1"),
+    # Markers must stand at token boundaries and not be doubled, so paths and
+    # identifiers (/tmp/_x_/, a-b-c, __init__) survive
+    ("emphasis",
+     r"(?<![^\s(\[{\"'])([*_+\-^~])(?!\1)(\S(?:[^\n]*?\S)?)\1(?!\1)(?=[\s.,;:!?)\]}\"']|$)",
+     r"\2"),
+    ("table_pipes", r"\|\|?", " "),
+]
+
+_MASK_RULES = [
+    ("urls", r"\b(?:https?|ftp)://[^\s<>\"')\]]+", "<url>"),
+    ("emails", r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b", "<email>"),
+    ("uuids", r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b", "<uuid>"),
+    ("timestamps",
+     r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?\b|\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b",
+     "<ts>"),
+    ("dates", r"\b\d{4}-\d{2}-\d{2}\b", "<date>"),
+    ("ip_addresses", r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b", "<ip>"),
+    ("hex_ids", r"\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{12,}\b", "<hex>"),
+    # Issue keys (NFSAAS-148554) are kept - a cited ticket is a strong similarity signal
+    ("long_numbers", r"(?<![A-Z]-)\b\d{6,}\b", "<num>"),
+]
+
+# One line of a Java / Python / native stack trace
+_STACK_FRAME_RE = re.compile(
+    r"^\s*(?:at\s+[\w$.<>/]+\(.*\)"
+    r"|File \"[^\"]+\", line \d+.*"
+    r"|#\d+\s+(?:0x[0-9a-fA-F]+|<hex>)\s.*"
+    r"|\.\.\.\s*\d+\s+more)\s*$"
+)
+
+
+class TextNormalizer:
+    """
+    Compiled normalization pipeline with per-rule statistics.
+
+    Stages:
+        1. Jira wiki markup is stripped ({code}, [text|url], h1., *bold*, ...)
+        2. Volatile tokens are masked (URLs, GUIDs, timestamps, IPs, hex ids)
+        3. Stack traces are cut to the first max_stack_frames frames
+        4. Consecutive identical lines are collapsed ("(repeated N times)")
+        5. Whitespace is squeezed
+
+    Masking runs before line collapsing so log lines that differ only by
+    timestamp or request id collapse too.
+    """
+
+    def __init__(self, max_stack_frames: int = None, mask_ids: bool = None):
+        """
+        Compile the pipeline.
+
+        Args:
+            max_stack_frames: Frames kept per stack trace (env NORMALIZE_MAX_STACK_FRAMES, default 3)
+            mask_ids: Mask URLs / IDs / timestamps (env NORMALIZE_MASK_IDS, default true)
+        """
+        if max_stack_frames is None:
+            max_stack_frames = int(os.getenv("NORMALIZE_MAX_STACK_FRAMES", "3"))
+        if mask_ids is None:
+            mask_ids = os.getenv("NORMALIZE_MASK_IDS", "true").lower() == "true"
+        self.max_stack_frames = max_stack_frames
+
+        rules = _MARKUP_RULES + (_MASK_RULES if mask_ids else [])
+        self._rules: List[Tuple[str, re.Pattern, str]] = [
+            (name, re.compile(pattern, re.DOTALL if name == "monospace" else 0), replacement)
+            for name, pattern, replacement in rules
+        ]
+
+        self.stats: Counter = Counter()
+
+    def normalize(self, text: str) -> str:
+        """
+        Normalize one ticket text.
+
+        Args:
+            text: Raw summary/description text
+
+        Returns:
+            Cleaned text
+        """
+        if not text:
+            return ""
+
+        self.stats["texts"] += 1
+        self.stats["chars_in"] += len(text)
+
+        for name, pattern, replacement in self._rules:
+            text, count = pattern.subn(replacement, text)
+            if count:
+                self.stats[name] += count
+
+        lines = self._dedupe_stack_frames(text.splitlines())
+        lines = self._collapse_repeated_lines(lines)
+
+        text = "\n".join(line for line in lines if line)
+        text = re.sub(r"[ \t]+", " ", text).strip()
+
+        self.stats["chars_out"] += len(text)
+        return text
+
+    def _dedupe_stack_frames(self, lines: List[str]) -> List[str]:
+        """Keep the first max_stack_frames frames of each trace and summarize the rest."""
+        result, run = [], 0
+        for line in lines:
+            if _STACK_FRAME_RE.match(line):
+                run += 1
+                if run <= self.max_stack_frames:
+                    result.append(line.strip())
+                continue
+            if run > self.max_stack_frames:
+                result.append(f"... {run - self.max_stack_frames} more frames")
+                self.stats["stack_frames"] += run - self.max_stack_frames
+            run = 0
+            result.append(line)
+        if run > self.max_stack_frames:
+            result.append(f"... {run - self.max_stack_frames} more frames")
+            self.stats["stack_frames"] += run - self.max_stack_frames
+        return result
+
+    def _collapse_repeated_lines(self, lines: List[str]) -> List[str]:
+        """Replace runs of identical lines with one copy plus a repeat count."""
+        result: List[str] = []
+        previous, repeats = None, 0
+        for line in lines:
+            line = line.strip()
+            if line and line == previous:
+                repeats += 1
+                continue
+            if repeats:
+                result.append(f"(repeated {repeats + 1} times)")
+                self.stats["repeated_lines"] += repeats
+            result.append(line)
+            previous, repeats = line, 0
+        if repeats:
+            result.append(f"(repeated {repeats + 1} times)")
+            self.stats["repeated_lines"] += repeats
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-rule match counts and the overall size reduction."""
+        stats = dict(self.stats)
+        chars_in = stats.get("chars_in", 0)
+        stats["reduction"] = round(1 - stats.get("chars_out", 0) / chars_in, 3) if chars_in else 0.0
+        return stats
@@ -0,0 +1,121 @@
+"""
+Declarative ticket filters that compile to JQL, with an in-code fallback.
+Lets the scheduler push Hyperscaler / Technical Owner checks to Jira so
+non-matching issues are never transferred.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+
+def _jql_field(field: str) -> str:
+    """Map a REST field id to its JQL name (customfield_16202 -> cf[16202])."""
+    match = re.fullmatch(r"customfield_(\d+)", field)
+    return f"cf[{match.group(1)}]" if match else field
+
+
+def field_values(raw: Any) -> List[str]:
+    """Flatten option/array/user field shapes to comparable strings."""
+    if raw is None or raw == "" or raw == []:
+        return []
+    items = raw if isinstance(raw, list) else [raw]
+    values = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("value") or item.get("name") or item.get("key") or ""
+        values.append(str(item))
+    return values
+
+
+class FieldFilter:
+    """
+    One condition on a Jira field.
+
+    Supported operators:
+        'equals'    - any value of the field equals value (case-insensitive)
+        'empty'     - field is unset
+        'not_empty' - field is set
+    """
+
+    OPERATORS = ("equals", "empty", "not_empty")
+
+    def __init__(self, field: str, op: str, value: str = None, jql: bool = True):
+        """
+        Args:
+            field: REST field id (e.g. 'customfield_16202')
+            op: One of OPERATORS
+            value: Comparison value for 'equals'
+            jql: Push this condition into JQL (False = only check in code)
+        """
+        if op not in self.OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if op == "equals" and value is None:
+            raise ValueError(f"Filter on {field} with 'equals' needs a value")
+        self.field = field
+        self.op = op
+        self.value = value
+        self.jql = jql
+
+    def to_jql(self) -> str:
+        """Render as a JQL clause."""
+        name = _jql_field(self.field)
+        if self.op == "equals":
+            escaped = self.value.replace('"', '\\"')
+            return f'{name} = "{escaped}"'
+        if self.op == "empty":
+            return f"{name} is EMPTY"
+        return f"{name} is not EMPTY"
+
+    def matches(self, fields: Dict[str, Any]) -> bool:
+        """Evaluate against an issue's fields (raw 'fields' dict or flattened ticket)."""
+        values = field_values(fields.get(self.field))
+        if self.op == "equals":
+            return any(v.upper() == self.value.upper() for v in values)
+        if self.op == "empty":
+            return not values
+        return bool(values)
+
+    def __repr__(self) -> str:
+        return f"FieldFilter({self.field!r}, {self.op!r}, {self.value!r}, jql={self.jql})"
+
+
+# Hyperscaler multi-select contains Azure - shared by the scheduler's search
+# and process_ticket_data so both accept exactly the same tickets
+AZURE_HYPERSCALER_FILTER = FieldFilter("customfield_16202", "equals", "Azure")
+
+
+class TicketFilterSpec:
+    """A conjunction of FieldFilters split into a JQL part and an in-code part."""
+
+    def __init__(self, filters: List[FieldFilter], pushdown: bool = True):
+        """
+        Args:
+            filters: Conditions that must all hold
+            pushdown: Allow filters marked jql=True to be sent to Jira
+        """
+        self.filters = filters
+        self.pushdown = pushdown
+
+    @property
+    def jql_filters(self) -> List[FieldFilter]:
+        return [f for f in self.filters if self.pushdown and f.jql]
+
+    @property
+    def code_filters(self) -> List[FieldFilter]:
+        return [f for f in self.filters if not (self.pushdown and f.jql)]
+
+    def jql(self) -> Optional[str]:
+        """AND-joined JQL for the pushed-down filters, or None."""
+        clauses = [f.to_jql() for f in self.jql_filters]
+        return " AND ".join(clauses) if clauses else None
+
+    def code_fields(self) -> List[str]:
+        """Fields that must be fetched to evaluate the in-code filters."""
+        return list(dict.fromkeys(f.field for f in self.code_filters))
+
+    def matches(self, fields: Dict[str, Any], include_jql: bool = False) -> bool:
+        """
+        Evaluate the in-code filters (or all filters with include_jql=True,
+        for issues that did not come from the filtered search).
+        """
+        filters = self.filters if include_jql else self.code_filters
+        return all(f.matches(fields) for f in filters)
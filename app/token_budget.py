@@ -0,0 +1,115 @@
+"""
+Token-aware text budgeting for embedding and LLM requests.
+Truncates and chunks by tokens of the target model instead of by characters,
+so request size (and cost) is predictable and never overflows the model limit.
+"""
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when tiktoken is unavailable
+_CHARS_PER_TOKEN = 4
+
+# Fallback encoding for models tiktoken doesn't know (e.g. proxy aliases)
+_DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model: str):
+    """
+    Return the (cached) tiktoken encoder for a model.
+
+    Args:
+        model: Model name, e.g. 'text-embedding-ada-002' or 'gpt-4'
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken is not installed
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken not installed - token budgets are approximated from character counts")
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(_DEFAULT_ENCODING)
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count tokens of text for model."""
+    if not text:
+        return 0
+    encoder = get_encoder(model)
+    if encoder is None:
+        return len(text) // _CHARS_PER_TOKEN + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str, suffix: str = "") -> str:
+    """
+    Cut text to at most max_tokens tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+        model: Model whose tokenizer defines the budget
+        suffix: Appended only when the text was actually cut (e.g. '...')
+
+    Returns:
+        The text unchanged if it fits, otherwise its first max_tokens tokens
+    """
+    if not text or max_tokens <= 0:
+        return "" if max_tokens <= 0 else text
+
+    encoder = get_encoder(model)
+    if encoder is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        return text if len(text) <= max_chars else text[:max_chars] + suffix
+
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens]) + suffix
+
+
+def chunk_tokens(
+    text: str,
+    chunk_size: int,
+    model: str,
+    overlap: int = 0,
+    max_chunks: Optional[int] = None
+) -> List[str]:
+    """
+    Split text into consecutive windows of at most chunk_size tokens.
+
+    Args:
+        text: Text to split
+        chunk_size: Tokens per chunk
+        model: Model whose tokenizer defines the chunks
+        overlap: Tokens shared between neighboring chunks
+        max_chunks: Stop after this many chunks (the tail is dropped)
+
+    Returns:
+        List of chunk texts ([text] if it already fits)
+    """
+    if not text:
+        return []
+    overlap = max(0, min(overlap, chunk_size - 1))
+    step = chunk_size - overlap
+
+    encoder = get_encoder(model)
+    if encoder is None:
+        size, stride = chunk_size * _CHARS_PER_TOKEN, step * _CHARS_PER_TOKEN
+        pieces = [text[i:i + size] for i in range(0, max(len(text) - overlap * _CHARS_PER_TOKEN, 1), stride)]
+    else:
+        tokens = encoder.encode(text, disallowed_special=())
+        pieces = [
+            encoder.decode(tokens[i:i + chunk_size])
+            for i in range(0, max(len(tokens) - overlap, 1), step)
+        ]
+
+    return pieces[:max_chunks] if max_chunks else pieces
@@ -0,0 +1,303 @@
+"""
+In-process exact kNN index mirroring a Chroma collection.
+A few thousand ticket vectors fit in one contiguous float32 matrix, so a
+matrix-vector product answers a 20-NN query without a round trip to Chroma.
+Chroma stays the source of truth; the index is a synced, memory-mapped copy.
+"""
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = Path(__file__).parent.parent / "data" / "vector_index"
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _matches_where(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """
+    Evaluate a Chroma-style where filter against one metadata dict.
+
+    Supports {field: value}, {field: {"$eq"|"$ne"|"$in"|"$nin": ...}} and
+    {"$and"|"$or": [...]}. Like Chroma, a missing field never matches.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches_where(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches_where(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        if key not in metadata:
+            return False
+        value = metadata[key]
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, operand in condition.items():
+            if op == "$eq" and value != operand:
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$in" and value not in operand:
+                return False
+            if op == "$nin" and value in operand:
+                return False
+            if op not in ("$eq", "$ne", "$in", "$nin"):
+                raise ValueError(f"Unsupported where operator for local index: {op}")
+    return True
+
+
+class IndexSnapshot(NamedTuple):
+    """One consistent, immutable view of the index contents."""
+    vectors: np.ndarray
+    ids: List[str]
+    metadatas: List[Dict[str, Any]]
+    space: str
+    version: str
+    trained_at: str
+
+
+class LocalVectorIndex:
+    """
+    Exact cosine kNN over a normalized float32 matrix plus metadata arrays.
+
+    Files (per collection, under data/vector_index/<collection>/):
+        vectors.npy - row-normalized float32 matrix, memory-mapped on load
+        meta.json   - ids, metadatas, the collection's distance space and
+                      the trained_at stamp it was synced from
+
+    Distances are reported in the collection's own metric (Chroma's default
+    squared L2, cosine or inner product) so they can be compared with
+    Chroma query results; for unit vectors all of them order like cosine.
+
+    load() may run in a worker thread while searches run on the event loop,
+    so the contents live in a single IndexSnapshot that is replaced in one
+    assignment; readers take the snapshot once and never see a mix of old
+    and new rows.
+    """
+
+    def __init__(self, collection_name: str, index_dir: str = None):
+        """
+        Args:
+            collection_name: Chroma collection this index mirrors
+            index_dir: Parent directory (env LOCAL_VECTOR_INDEX_DIR, default data/vector_index)
+        """
+        base = Path(index_dir or os.getenv("LOCAL_VECTOR_INDEX_DIR", str(DEFAULT_INDEX_DIR)))
+        self.collection_name = collection_name
+        self.path = base / collection_name
+        self.snapshot: Optional[IndexSnapshot] = None
+        self._loaded_mtime = None
+
+    def __len__(self) -> int:
+        snapshot = self.snapshot
+        return len(snapshot.ids) if snapshot else 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.snapshot is not None
+
+    @property
+    def version(self) -> str:
+        snapshot = self.snapshot
+        return snapshot.version if snapshot else ""
+
+    def _meta_mtime(self) -> Optional[float]:
+        meta_file = self.path / "meta.json"
+        return meta_file.stat().st_mtime if meta_file.exists() else None
+
+    def load(self) -> bool:
+        """
+        Load (memory-map) the index from disk.
+
+        Returns:
+            True if an index was found and loaded
+        """
+        mtime = self._meta_mtime()
+        if mtime is None:
+            return False
+
+        with open(self.path / "meta.json") as f:
+            meta = json.load(f)
+        vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        if vectors.shape[0] != len(meta["ids"]):
+            logger.warning(f"Vector index {self.path} is inconsistent, ignoring it")
+            return False
+
+        self.snapshot = IndexSnapshot(
+            vectors=vectors,
+            ids=meta["ids"],
+            metadatas=meta["metadatas"],
+            space=meta.get("space", "l2"),
+            version=str(meta.get("synced_at", "")),
+            trained_at=str(meta.get("trained_at", "")),
+        )
+        self._loaded_mtime = mtime
+        logger.info(f"Loaded vector index {self.collection_name}: {len(meta['ids'])} vectors")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload when another process (e.g. training) rewrote the files."""
+        mtime = self._meta_mtime()
+        if mtime is not None and mtime != self._loaded_mtime:
+            return self.load()
+        return False
+
+    @staticmethod
+    def _trained_at(collection) -> str:
+        return str((collection.metadata or {}).get("trained_at", ""))
+
+    def needs_sync(self, collection, count: int) -> bool:
+        """
+        Whether the index no longer mirrors the collection.
+
+        A retrain keeps the count unchanged more often than not, so the
+        collection's trained_at stamp is compared as well.
+
+        Args:
+            collection: chromadb Collection
+            count: Its current collection.count()
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return True
+        return count != len(snapshot.ids) or self._trained_at(collection) != snapshot.trained_at
+
+    def sync_from_collection(self, collection, page_size: int = 1000) -> int:
+        """
+        Rebuild the index from a Chroma collection and persist it.
+
+        Args:
+            collection: chromadb Collection
+            page_size: Vectors fetched per request
+
+        Returns:
+            Number of vectors indexed
+        """
+        start = time.time()
+        ids, metadatas, chunks = [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+            if len(page["ids"]) == 0:
+                break
+            ids.extend(page["ids"])
+            metadatas.extend(m or {} for m in page["metadatas"])
+            chunks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            offset += len(page["ids"])
+            if len(page["ids"]) < page_size:
+                break
+
+        vectors = normalize_rows(np.concatenate(chunks)) if chunks else np.zeros((0, 0), dtype=np.float32)
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        trained_at = self._trained_at(collection)
+
+        # Write next to the live files, then swap them in atomically
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.path / "vectors.tmp.npy"
+        tmp_meta = self.path / "meta.tmp.json"
+        np.save(tmp_vectors, np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(tmp_meta, "w") as f:
+            json.dump({
+                "ids": ids,
+                "metadatas": metadatas,
+                "space": space,
+                "trained_at": trained_at,
+                "synced_at": time.time(),
+            }, f)
+        os.replace(tmp_vectors, self.path / "vectors.npy")
+        os.replace(tmp_meta, self.path / "meta.json")
+
+        self.load()
+        logger.info(f"Synced vector index {self.collection_name}: {len(ids)} vectors in {time.time() - start:.2f}s")
+        return len(ids)
+
+    @staticmethod
+    def _distances(similarities: np.ndarray, space: str) -> np.ndarray:
+        """Convert cosine similarities to the collection's distance metric."""
+        if space == "l2":
+            return np.maximum(0.0, 2.0 - 2.0 * similarities)
+        return 1.0 - similarities
+
+    def search(
+        self,
+        query: List[float],
+        k: int = 20,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List]:
+        """
+        Exact k nearest neighbors of one query vector.
+
+        Args:
+            query: Query embedding
+            k: Neighbors to return
+            where: Optional Chroma-style metadata filter
+
+        Returns:
+            Dict with 'ids', 'distances' and 'metadatas' lists, nearest first
+        """
+        return self.search_many([query], k=k, where=where)[0]
+
+    def search_many(
+        self,
+        queries: List[List[float]],
+        k: int = 20,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, List]]:
+        """
+        Exact k nearest neighbors for many queries with one matrix multiply.
+
+        Args:
+            queries: Query embeddings
+            k: Neighbors per query
+            where: Optional Chroma-style metadata filter applied to all queries
+
+        Returns:
+            One {'ids', 'distances', 'metadatas'} dict per query, nearest first
+        """
+        empty = {"ids": [], "distances": [], "metadatas": []}
+        if len(queries) == 0:
+            return []
+        snapshot = self.snapshot
+        if snapshot is None or len(snapshot.ids) == 0:
+            return [dict(empty) for _ in queries]
+
+        q = normalize_rows(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+        similarities = q @ snapshot.vectors.T
+        if where:
+            mask = np.fromiter(
+                (_matches_where(m, where) for m in snapshot.metadatas), dtype=bool, count=len(snapshot.ids)
+            )
+            similarities[:, ~mask] = -np.inf
+            k = min(k, int(mask.sum()))
+        k = min(k, len(snapshot.ids))
+        if k <= 0:
+            return [dict(empty) for _ in queries]
+
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        distances = self._distances(np.take_along_axis(top_similarities, order, axis=1), snapshot.space)
+
+        return [
+            {
+                "ids": [snapshot.ids[i] for i in row],
+                "distances": row_distances.tolist(),
+                "metadatas": [snapshot.metadatas[i] for i in row],
+            }
+            for row, row_distances in zip(top, distances)
+        ]
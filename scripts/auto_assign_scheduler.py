@@ -8,7 +8,7 @@ import sys
 import asyncio
 import time
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from pathlib import Path
 
@@ -20,6 +20,8 @@ load_dotenv()
 
 from app.enhanced_chroma_client import EnhancedTicketEmbeddingClient
 from app.jira_client import JiraClient
+from app.state_store import ProcessedTicketStore
+from app.ticket_filters import AZURE_HYPERSCALER_FILTER, FieldFilter, TicketFilterSpec
 
 # Configure logging to file with append mode
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -42,96 +44,185 @@ logger = logging.getLogger(__name__)
 class JiraAutoAssignScheduler:
     """Scheduler to automatically assign unassigned JIRA tickets."""
     
-    def __init__(self, interval_seconds: int = 20):
+    def __init__(self, interval_seconds: int = 20, max_concurrency: int = None):
         """
         Initialize the scheduler.
         
         Args:
             interval_seconds: How often to check for unassigned tickets (default: 60 seconds)
+            max_concurrency: Tickets processed in parallel per run (env AUTO_ASSIGN_MAX_CONCURRENCY, default 5)
         """
         self.interval_seconds = interval_seconds
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv('AUTO_ASSIGN_MAX_CONCURRENCY', 5)))
         self.jira_client = JiraClient()
         self.embedding_client = None
-        self.processed_tickets = set()  # Track processed tickets to avoid duplicates
-        self.start_time = datetime.now()  # Record when scheduler started
+        # Durable record of processed tickets (survives restarts, pruned by retention)
+        self.processed_tickets = ProcessedTicketStore()
+        self.start_time = self._resume_start_time()  # Polling window start (persisted)
+        
+        # 'incremental' (updated-since change feed) or 'created' (full window each poll)
+        self.poll_mode = os.getenv('AUTO_ASSIGN_POLL_MODE', 'incremental').lower()
+        self.poll_overlap = timedelta(minutes=int(os.getenv('AUTO_ASSIGN_POLL_OVERLAP_MINUTES', 2)))
+        self._pending_watermark = None
+        
+        # Eligibility: Azure Hyperscaler and no Technical Owner. Pushed into JQL
+        # unless AUTO_ASSIGN_PUSHDOWN_FILTERS=false (then checked in code).
+        self.ticket_filter = TicketFilterSpec(
+            [
+                AZURE_HYPERSCALER_FILTER,  # Hyperscaler
+                FieldFilter('customfield_10050', 'empty'),  # Technical Owner
+            ],
+            pushdown=os.getenv('AUTO_ASSIGN_PUSHDOWN_FILTERS', 'true').lower() == 'true'
+        )
         self.is_running = False  # Lock to prevent concurrent runs
         
+    def _resume_start_time(self) -> datetime:
+        """
+        Resume the polling window from the persisted watermark.
+        
+        Falls back to now on first run, and never looks back further than
+        AUTO_ASSIGN_MAX_LOOKBACK_HOURS (default 24) after a long outage.
+        """
+        now = datetime.now()
+        watermark = self.processed_tickets.get_watermark()
+        max_lookback = timedelta(hours=int(os.getenv('AUTO_ASSIGN_MAX_LOOKBACK_HOURS', 24)))
+        
+        if watermark is None:
+            start_time = now
+        else:
+            start_time = max(watermark, now - max_lookback)
+            logger.info(f"Resuming polling window from {start_time.strftime('%Y-%m-%d %H:%M:%S')} (stored watermark: {watermark})")
+        
+        self.processed_tickets.set_watermark(start_time)
+        return start_time
+    
     def _get_embedding_client(self) -> EnhancedTicketEmbeddingClient:
         """Get or create embedding client (lazy initialization)."""
         if self.embedding_client is None:
-            self.embedding_client = EnhancedTicketEmbeddingClient()
+            # Share the scheduler's Jira connection pool
+            self.embedding_client = EnhancedTicketEmbeddingClient(jira_client=self.jira_client)
         return self.embedding_client
     
-    async def fetch_unassigned_tickets(self) -> List[str]:
+    def _build_jql(self) -> str:
         """
-        Fetch unassigned JIRA tickets created after the scheduler started.
+        Build the polling JQL for the configured poll mode.
         
-        Returns:
-            List of ticket keys
+        'incremental' only asks for issues updated since the last completed
+        poll (minus an overlap for clock skew and Jira's minute precision),
+        so poll cost stays flat through the day and tickets that become
+        eligible after creation are still seen. 'created' re-reads the whole
+        window since start_time on every poll.
+        
+        Both modes page in created/key order: an update during the walk
+        would move an issue within 'ORDER BY updated' and shift later pages.
         """
         # Format start time for JIRA query (YYYY-MM-DD HH:MM)
         # JIRA accepts format like "2025-12-11 14:30"
         start_timestamp = self.start_time.strftime('%Y-%m-%d %H:%M')
         
+        if self.poll_mode == 'incremental':
+            watermark = self.processed_tickets.get_watermark('updated') or self.start_time
+            since = max(watermark - self.poll_overlap, self.start_time)
+            since_timestamp = since.strftime('%Y-%m-%d %H:%M')
+            print(f"🔍 Searching for tickets created after {start_timestamp}, updated since {since_timestamp}...")
+            window_clause = f'AND updated >= "{since_timestamp}"'
+        else:
+            print(f"🔍 Searching for tickets created after {start_timestamp}...")
+            window_clause = ''
+        order_by = 'ORDER BY created ASC, key ASC'
+        
+        # Azure / Technical Owner conditions, addressed as cf[<id>] so they
+        # don't depend on per-instance field names
+        filter_jql = self.ticket_filter.jql()
+        filter_clause = f'AND {filter_jql}' if filter_jql else ''
+        
         # JQL query for unassigned tickets created after scheduler start
-        # Note: We'll filter by Azure and Technical Owner in code after fetching
-        # since JQL field names may vary by JIRA instance
         # IMPORTANT: Exclude Done/Resolved/Closed tickets
-        jql = f'''
+        return f'''
             project = NFSAAS 
             AND issuetype = Bug 
             AND created >= "{start_timestamp}"
+            {window_clause}
+            {filter_clause}
             AND status NOT IN (Done, Resolved, Closed, Cancelled, Withdrawn)
-            ORDER BY created ASC
+            {order_by}
         '''
+    
+    async def fetch_unassigned_tickets(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch unassigned JIRA tickets created after the scheduler started.
         
-        print(f"🔍 Searching for tickets created after {start_timestamp}...")
+        The search requests every field the prediction pipeline needs, so the
+        returned payloads can be processed without refetching each ticket.
+        In incremental mode, failed tickets due for a retry are re-read with
+        one bulk fetch since the change feed won't return them again.
+        
+        Returns:
+            Dict mapping ticket key -> ticket payload, in search order
+        """
+        poll_started = datetime.now()
+        jql = self._build_jql()
         
         try:
-            # Search for tickets
-            result = await self.jira_client.search_issues(
+            # Stream every matching ticket page by page (no 100-issue cap)
+            filtered_tickets = {}
+            checked_count = 0
+            page_totals = []
+            # Only the fields processing needs plus any in-code filter fields
+            fields = list(dict.fromkeys(self.jira_client.ticket_fields + self.ticket_filter.code_fields()))
+            async for ticket in self.jira_client.iter_issues(
                 jql=jql,
-                fields=['key', 'summary', 'created', 'customfield_16202', 'customfield_10050'],
-                max_results=100  # Fetch more since we'll filter in code
-            )
-            
-            tickets = result.get('issues', [])
-            
-            # Filter tickets in code (Azure + no Technical Owner)
-            filtered_keys = []
-            for ticket in tickets:
-                fields = ticket.get('fields', {})
-                
-                # Check Hyperscaler (customfield_16202) = Azure (array format)
-                hyperscaler = fields.get('customfield_16202')
-                hyperscaler_value = None
-                if hyperscaler and isinstance(hyperscaler, list) and len(hyperscaler) > 0:
-                    hyperscaler_value = hyperscaler[0].get('value')
+                fields=fields,
+                page_size=100,
+                page_totals=page_totals
+            ):
+                checked_count += 1
                 
-                # Check Technical Owner (customfield_10050) is empty
-                technical_owner = fields.get('customfield_10050')
+                # Apply filters JQL could not express (all of them if pushdown is off);
+                # overlapping polls may return a ticket twice - keep one
+                if self.ticket_filter.matches(ticket.get('fields', {})):
+                    filtered_tickets[ticket['key']] = self.jira_client.parse_ticket(
+                        ticket['key'], ticket, debug_dump=False
+                    )
+            
+            if self.poll_mode == 'incremental':
+                retry_keys = [k for k in self.processed_tickets.retry_candidates() if k not in filtered_tickets]
+                if retry_keys:
+                    print(f"🔁 Re-reading {len(retry_keys)} failed ticket(s) due for retry")
+                    retried = await self.jira_client.get_issues_bulk(retry_keys)
+                    checked_count += len(retried)
+                    for key, ticket in retried.items():
+                        # Not from the filtered search - check every condition
+                        if self.ticket_filter.matches(ticket, include_jql=True):
+                            filtered_tickets[key] = ticket
                 
-                # Only include if Azure and no Technical Owner
-                if hyperscaler_value and hyperscaler_value.upper() == 'AZURE' and not technical_owner:
-                    filtered_keys.append(ticket['key'])
+                # Only advance once the whole feed was read; run_once commits it
+                # after the tickets have been processed. If issues left or joined
+                # the result set mid-walk, offset paging may have skipped one, so
+                # keep the old watermark and read the same window again next poll.
+                if len(set(page_totals)) > 1:
+                    print(f"⚠️  Result set changed during the walk ({page_totals[0]} -> {page_totals[-1]}), not advancing the watermark")
+                else:
+                    self._pending_watermark = poll_started
             
-            if filtered_keys:
-                print(f"✅ Found {len(filtered_keys)} unassigned Azure ticket(s): {', '.join(filtered_keys)}")
+            if filtered_tickets:
+                print(f"✅ Found {len(filtered_tickets)} unassigned Azure ticket(s): {', '.join(filtered_tickets)}")
             else:
-                print(f"✅ No unassigned Azure tickets found (checked {len(tickets)} total tickets)")
+                print(f"✅ No unassigned Azure tickets found (checked {checked_count} total tickets)")
             
-            return filtered_keys
+            return filtered_tickets
             
         except Exception as e:
             print(f"❌ Error fetching tickets: {e}")
-            return []
+            return {}
     
-    async def process_ticket(self, ticket_key: str) -> Dict[str, Any]:
+    async def process_ticket(self, ticket_key: str, ticket: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Process a single ticket for auto-assignment.
         
         Args:
             ticket_key: JIRA ticket key
+            ticket: Ticket payload from the search (refetched from JIRA if omitted)
             
         Returns:
             Result dictionary
@@ -149,7 +240,10 @@ class JiraAutoAssignScheduler:
             logger.info(f"Processing ticket: {ticket_key}")
             logger.info(f"{'='*80}")
             
-            result = await client.process_webhook_ticket(ticket_key, assign_in_jira=True)
+            if ticket:
+                result = await client.process_ticket_data(ticket, assign_in_jira=True)
+            else:
+                result = await client.process_webhook_ticket(ticket_key, assign_in_jira=True)
             
             if result.get('status') == 'success':
                 predicted_team = result.get('predicted_team', 'Unknown')
@@ -162,6 +256,7 @@ class JiraAutoAssignScheduler:
                 
                 logger.info(f"✅ SUCCESS - Ticket {ticket_key} assigned to {predicted_team}")
                 logger.info(f"   Confidence: {confidence:.1%}")
+                logger.info(f"   Decision path: {result.get('decision_path', 'llm')} (vote margin {result.get('vote_margin', 0):.2f})")
                 logger.info(f"   LLM Reasoning: {llm_reasoning}")
                 
                 # Log similar tickets if available
@@ -225,11 +320,11 @@ class JiraAutoAssignScheduler:
             logger.info(f"   Total processed so far: {len(self.processed_tickets)} tickets")
             logger.info(f"{'='*80}")
             
-            # Fetch unassigned tickets
-            ticket_keys = await self.fetch_unassigned_tickets()
+            # Fetch unassigned tickets (key -> payload)
+            tickets = await self.fetch_unassigned_tickets()
             
             # Filter out already processed tickets
-            new_tickets = [key for key in ticket_keys if key not in self.processed_tickets]
+            new_tickets = [key for key in tickets if key not in self.processed_tickets]
             
             # Track results
             success_count = 0
@@ -237,12 +332,20 @@ class JiraAutoAssignScheduler:
             skipped_count = 0
             
             if new_tickets:
-                print(f"📋 Processing {len(new_tickets)} new ticket(s)...")
+                print(f"📋 Processing {len(new_tickets)} new ticket(s) ({self.max_concurrency} at a time)...")
                 logger.info(f"📋 Processing {len(new_tickets)} new ticket(s): {', '.join(new_tickets)}")
                 
-                # Process each ticket
-                for ticket_key in new_tickets:
-                    result = await self.process_ticket(ticket_key)
+                # Process tickets concurrently, at most max_concurrency in flight
+                # No fixed delay needed - JiraClient's rate limiter paces requests
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                
+                async def _process_bounded(ticket_key: str):
+                    async with semaphore:
+                        return ticket_key, await self.process_ticket(ticket_key, tickets[ticket_key])
+                
+                tasks = [asyncio.create_task(_process_bounded(key)) for key in new_tickets]
+                for task in asyncio.as_completed(tasks):
+                    ticket_key, result = await task
                     
                     # Track results
                     status = result.get('status', 'unknown')
@@ -253,11 +356,9 @@ class JiraAutoAssignScheduler:
                     else:
                         failed_count += 1
                     
-                    # Mark as processed (even if failed, to avoid retrying immediately)
-                    self.processed_tickets.add(ticket_key)
-                    
-                    # Small delay between tickets to avoid rate limiting
-                    await asyncio.sleep(2)
+                    # Mark as processed (failed tickets are retried after a cool-down)
+                    detail = result.get('predicted_team') or result.get('reason') or result.get('message')
+                    self.processed_tickets.record(ticket_key, status, detail)
                 
                 # Log summary
                 logger.info(f"\n📊 Job Summary:")
@@ -266,10 +367,26 @@ class JiraAutoAssignScheduler:
                 logger.info(f"   ❌ Failed: {failed_count}")
                 logger.info(f"   📝 Total processed in this run: {len(new_tickets)}")
                 
+                jira_metrics = self.jira_client.get_metrics()
+                limiter = jira_metrics['rate_limiter']
+                logger.info(f"   🚦 Jira rate: {limiter['rate']:.2f} req/s (throttled {limiter['throttled']}x, waited {limiter['total_wait_seconds']:.1f}s)")
+                if jira_metrics['retries']:
+                    logger.info(f"   🔁 Jira retries (cumulative): {jira_metrics['retries']}")
+                if self.embedding_client is not None:
+                    llm_metrics = self.embedding_client.get_llm_metrics()
+                    paths = llm_metrics['knn']
+                    logger.info(f"   ⚡ Decision paths (cumulative): {paths['fast_path']} fast, {paths['llm']} LLM ({paths['fast_path_rate']:.0%} fast)")
+                    for model, tier in llm_metrics['tiers'].items():
+                        logger.info(
+                            f"   🧠 {model}: {tier['calls']} call(s) for {tier['tickets']} ticket(s), "
+                            f"avg {tier['avg_latency_seconds']:.2f}s, {tier['escalations']} escalated, "
+                            f"{tier['failures']} failed, ~${tier['cost_usd']:.4f}"
+                        )
+                
             else:
-                if ticket_keys:
-                    print(f"ℹ️  All {len(ticket_keys)} ticket(s) already processed in this session")
-                    logger.info(f"ℹ️  All {len(ticket_keys)} ticket(s) already processed in this session")
+                if tickets:
+                    print(f"ℹ️  All {len(tickets)} ticket(s) already processed in this session")
+                    logger.info(f"ℹ️  All {len(tickets)} ticket(s) already processed in this session")
             
                 job_end_time = datetime.now()
                 duration = (job_end_time - job_start_time).total_seconds()
@@ -282,6 +399,11 @@ class JiraAutoAssignScheduler:
                 logger.info(f"✅ Job Completed - {job_end_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 logger.info(f"   Duration: {duration:.1f} seconds")
                 logger.info(f"{'='*80}\n")
+            
+            # Advance the change-feed watermark only after this poll's tickets were handled
+            if self._pending_watermark is not None:
+                self.processed_tickets.set_watermark(self._pending_watermark, 'updated')
+                self._pending_watermark = None
         
         finally:
             # Always release the lock
@@ -295,19 +417,31 @@ class JiraAutoAssignScheduler:
         print(f"⏰ Check interval: Every {self.interval_seconds} seconds")
         print(f"🎯 Target: NFSAAS Bugs with Azure Hyperscaler")
         print(f"📅 Filter: Created after {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}, no Technical Owner")
+        print(f"🔄 Poll mode: {self.poll_mode}")
         print(f"⏱️  Scheduler started at: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*80}\n")
         
-        # Clear processed tickets at the start of each day
+        # Prune old processed-ticket records once a day
         last_clear_date = datetime.now().date()
         
+        try:
+            await self._run_loop(last_clear_date)
+        finally:
+            # Release pooled Jira/LLM connections and the state database on shutdown
+            if self.embedding_client is not None:
+                await self.embedding_client.close()
+            await self.jira_client.close()
+            self.processed_tickets.close()
+    
+    async def _run_loop(self, last_clear_date):
+        """Main polling loop for run_forever."""
         while True:
             try:
-                # Check if it's a new day - clear processed tickets
+                # Check if it's a new day - prune processed tickets
                 current_date = datetime.now().date()
                 if current_date != last_clear_date:
-                    print(f"📅 New day detected - clearing processed tickets cache")
-                    self.processed_tickets.clear()
+                    print(f"📅 New day detected - pruning processed tickets older than retention")
+                    self.processed_tickets.prune(self.start_time)
                     last_clear_date = current_date
                 
                 # Run one iteration
@@ -22,11 +22,11 @@ async def check_chromadb_status():
         client = EnhancedTicketEmbeddingClient()
         
         # Get collection
-        collection = client.chroma_client.get_collection('jira_tickets')
+        collection = client.chroma_client.get_collection(client.tickets_collection_name)
         count = collection.count()
         
         print(f"📊 COLLECTION STATS:")
-        print(f"   Collection: jira_tickets")
+        print(f"   Collection: {client.tickets_collection_name}")
         print(f"   Total tickets: {count}")
         
         if count > 0:
@@ -105,7 +105,7 @@ async def check_chromadb_status():
             
         # Check collection metadata
         try:
-            collection_info = client.chroma_client.get_collection('jira_tickets')
+            collection_info = client.chroma_client.get_collection(client.tickets_collection_name)
             print(f"\n📝 COLLECTION INFO:")
             print(f"   Name: {collection_info.name}")
             print(f"   ID: {collection_info.id}")
@@ -18,6 +18,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
 from app.enhanced_chroma_client import EnhancedTicketEmbeddingClient
+from app.token_budget import truncate_tokens
 
 
 # 12 NFSAAS teams to train
@@ -185,16 +186,21 @@ async def train_with_team_tickets():
     print("🧹 CLEANING UP CHROMADB")
     print("-" * 80)
     client = EnhancedTicketEmbeddingClient()
+    collection_name = client.tickets_collection_name
     
     try:
-        client.chroma_client.delete_collection('jira_tickets')
-        print("✅ Deleted existing collection")
+        client.chroma_client.delete_collection(collection_name)
+        print(f"✅ Deleted existing collection: {collection_name}")
     except:
         print("ℹ️  No existing collection to delete")
     
     collection = client.chroma_client.create_collection(
-        name='jira_tickets',
-        metadata={"description": "NFSAAS tickets from actual team assignments - 12 teams"}
+        name=collection_name,
+        # trained_at versions cached LLM predictions on every host sharing this collection
+        metadata={
+            "description": "NFSAAS tickets from actual team assignments - 12 teams",
+            "trained_at": datetime.now().isoformat()
+        }
     )
     print("✅ Created fresh collection\n")
     
@@ -202,13 +208,27 @@ async def train_with_team_tickets():
     print("🚀 TRAINING WITH TEAM-ASSIGNED TICKETS")
     print("-" * 80)
     print(f"📦 Total tickets to process: {len(all_tickets)}")
-    print(f"⏱️  Estimated time: ~{(len(all_tickets) * 2) // 60} minutes\n")
     
-    # Process in batches
-    batch_size = 50
+    # Process in batches - each batch is embedded with a few concurrent
+    # multi-text requests and written to ChromaDB with a single add()
+    batch_size = int(os.getenv('TRAINING_BATCH_SIZE', '500'))
+    # Token budget per ticket; long descriptions are chunked and pooled when enabled
+    max_tokens = int(os.getenv('TRAINING_MAX_TOKENS', '1500'))
+    chunk_long_texts = os.getenv('TRAINING_CHUNK_LONG_TEXT', 'false').lower() == 'true'
     successful = 0
     failed = 0
     
+    # Create full text for embedding
+    all_texts = [
+        f"{client.normalize_text(ticket['summary'])} {client.normalize_text(ticket['description'])}"
+        for ticket in all_tickets
+    ]
+    
+    # Local backends that learn corpus statistics (hashed TF-IDF) are fitted first
+    if hasattr(client.embedding_backend, 'fit'):
+        client.embedding_backend.fit(all_texts)
+        print(f"🧮 Fitted {client.embedding_backend.name} embedding backend on {len(all_texts)} tickets")
+    
     for i in range(0, len(all_tickets), batch_size):
         batch = all_tickets[i:i + batch_size]
         batch_num = i // batch_size + 1
@@ -216,44 +236,48 @@ async def train_with_team_tickets():
         
         print(f"📦 Batch {batch_num}/{total_batches} - Processing tickets {i+1} to {min(i+batch_size, len(all_tickets))}...")
         
-        batch_successful = 0
-        batch_failed = 0
+        texts = all_texts[i:i + batch_size]
+        
+        try:
+            embeddings = await client.generate_embeddings(
+                texts, max_tokens=max_tokens, chunk_long_texts=chunk_long_texts
+            )
+        except Exception as e:
+            print(f"   ⚠️  Batch embedding failed: {str(e)[:80]}")
+            embeddings = [None] * len(batch)
         
-        for j, ticket in enumerate(batch):
+        ids, batch_embeddings, documents, metadatas = [], [], [], []
+        for ticket, full_text, embedding in zip(batch, texts, embeddings):
+            if embedding is None:
+                print(f"   ⚠️  Failed {ticket['key']}: no embedding")
+                continue
+            ids.append(ticket['key'])
+            batch_embeddings.append(embedding)
+            documents.append(truncate_tokens(full_text, max_tokens, client.embedding_model))
+            metadatas.append({
+                'team': ticket['team'],
+                'summary': ticket['summary'][:200],
+                'created': ticket['created'],
+                'status': ticket['status']
+            })
+        
+        batch_successful = 0
+        if ids:
             try:
-                # Create full text for embedding
-                full_text = f"{ticket['summary']} {ticket['description']}"
-                
-                # Truncate if too long (to prevent token overflow)
-                if len(full_text) > 6000:
-                    full_text = full_text[:6000]
-                
-                # Generate embedding
-                embedding = await client.generate_embedding(full_text)
-                
                 # Add to ChromaDB with team assignment
                 collection.add(
-                    ids=[ticket['key']],
-                    embeddings=[embedding],
-                    documents=[full_text],
-                    metadatas=[{
-                        'team': ticket['team'],
-                        'summary': ticket['summary'][:200],
-                        'created': ticket['created'],
-                        'status': ticket['status']
-                    }]
+                    ids=ids,
+                    embeddings=batch_embeddings,
+                    documents=documents,
+                    metadatas=metadatas
                 )
-                successful += 1
-                batch_successful += 1
-                
-                # Show progress within batch every 10 tickets
-                if (j + 1) % 10 == 0:
-                    print(f"   ✓ {j + 1}/{len(batch)} tickets in this batch")
-                
+                batch_successful = len(ids)
             except Exception as e:
-                print(f"   ⚠️  Failed {ticket['key']}: {str(e)[:80]}")
-                failed += 1
-                batch_failed += 1
+                print(f"   ⚠️  Failed to add batch to ChromaDB: {str(e)[:80]}")
+        
+        batch_failed = len(batch) - batch_successful
+        successful += batch_successful
+        failed += batch_failed
         
         print(f"   ✅ Batch complete: {batch_successful} successful, {batch_failed} failed")
         print(f"   📊 Overall progress: {successful}/{len(all_tickets)} ({(successful/len(all_tickets)*100):.1f}%)\n")
@@ -264,7 +288,26 @@ async def train_with_team_tickets():
     print("=" * 80)
     print(f"✅ Successfully trained: {successful} tickets")
     print(f"❌ Failed: {failed} tickets")
-    print(f"📈 Success Rate: {(successful/len(all_tickets)*100):.1f}%\n")
+    print(f"📈 Success Rate: {(successful/len(all_tickets)*100):.1f}%")
+    if client.vector_index is not None:
+        indexed = client.vector_index.sync_from_collection(collection)
+        print(f"⚡ Local vector index rebuilt: {indexed} tickets")
+        client.rebuild_team_prototypes()
+    if client.prediction_cache is not None:
+        cleared = client.prediction_cache.clear()
+        print(f"🗑️  Cleared {cleared} cached prediction(s) from the previous model")
+    if client.text_normalizer is not None:
+        norm_stats = client.text_normalizer.get_stats()
+        rule_counts = ", ".join(
+            f"{name}={count}" for name, count in sorted(norm_stats.items())
+            if name not in ('texts', 'chars_in', 'chars_out', 'reduction')
+        )
+        print(f"🧹 Normalization: {norm_stats['reduction']:.1%} fewer characters ({rule_counts or 'no matches'})")
+    if client.embedding_cache is not None:
+        cache_stats = client.embedding_cache.stats()
+        print(f"🗄️  Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.1%} reused, {cache_stats['entries']} cached)")
+    print()
     
     print("📊 TICKETS PER TEAM:")
     print("-" * 80)
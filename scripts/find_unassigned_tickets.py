@@ -36,13 +36,12 @@ async def find_unassigned_tickets():
     print(f"JQL: {jql}\n")
     
     try:
-        result = await jira_client.search_issues(
-            jql=jql,
-            max_results=50,
-            fields=['summary', 'created', 'status', 'customfield_16202']
-        )
-        
-        tickets = result.get('issues', [])
+        tickets = [
+            ticket async for ticket in jira_client.iter_issues(
+                jql=jql,
+                fields=['summary', 'created', 'status', 'customfield_16202']
+            )
+        ]
         
         print(f"✅ Found {len(tickets)} unassigned bugs created today:")
         print("=" * 100)
@@ -66,6 +65,8 @@ async def find_unassigned_tickets():
     except Exception as e:
         print(f"Error searching for tickets: {e}")
         return []
+    finally:
+        await jira_client.close()
 
 
 async def main():
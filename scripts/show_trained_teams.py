@@ -18,7 +18,7 @@ def show_trained_teams():
     print("=" * 70)
     
     client = EnhancedTicketEmbeddingClient()
-    collection = client.chroma_client.get_collection('jira_tickets')
+    collection = client.chroma_client.get_collection(client.tickets_collection_name)
     
     # Get all tickets
     results = collection.get(include=['metadatas'])
@@ -16,10 +16,10 @@ from app.jira_client import JiraClient
 load_dotenv()
 
 
-def fetch_ticket_from_jira(ticket_key):
+async def fetch_ticket_from_jira(ticket_key):
     """Fetch ticket from JIRA."""
-    jira_client = JiraClient()
-    ticket = jira_client.fetch_ticket(ticket_key)
+    async with JiraClient() as jira_client:
+        ticket = await jira_client.fetch_ticket_async(ticket_key, fields=['summary', 'description'])
     
     return {
         'key': ticket.get('key', ticket_key),
@@ -36,19 +36,21 @@ async def predict_team(ticket_key):
     
     # Step 1: Fetch ticket
     print(f"\n📥 Step 1: Fetching ticket from JIRA...")
-    ticket = fetch_ticket_from_jira(ticket_key)
+    ticket = await fetch_ticket_from_jira(ticket_key)
     print(f"✅ Fetched: {ticket['summary'][:80]}...")
     
-    # Step 2: Create content for embedding
-    full_content = f"{ticket['summary']} {ticket['description']}"
-    print(f"\n📝 Step 2: Prepared content ({len(full_content)} characters)")
-    
-    # Step 3: Initialize ChromaDB client
-    print(f"\n🔌 Step 3: Connecting to ChromaDB...")
+    # Step 2: Initialize ChromaDB client
+    print(f"\n🔌 Step 2: Connecting to ChromaDB...")
     client = EnhancedTicketEmbeddingClient()
     total_tickets = client.tickets_collection.count()
     print(f"✅ Connected. Database has {total_tickets} tickets")
     
+    # Step 3: Create content for embedding - normalized like training and the scheduler
+    summary = client.normalize_text(ticket['summary'])
+    description = client.normalize_text(ticket['description'])
+    full_content = f"{summary} {description}"
+    print(f"\n📝 Step 3: Prepared content ({len(full_content)} characters)")
+    
     # Step 4: Generate embedding for the ticket
     print(f"\n🧮 Step 4: Generating embedding using LLM...")
     embedding = await client.generate_embedding(full_content)
@@ -78,8 +80,8 @@ async def predict_team(ticket_key):
     predicted_team, confidence, llm_reasoning = await client._predict_team_with_llm(
         new_ticket={
             "key": ticket_key,
-            "summary": ticket['summary'],
-            "description": ticket['description']
+            "summary": summary,
+            "description": description
         },
         similar_tickets=similar_tickets_context
     )